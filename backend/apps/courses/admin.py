@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Course, Department, CourseAllocation
+from .models import Course, Department, CourseAllocation, SeatHold, WaitlistEntry
 
 @admin.register(Department)
 class DepartmentAdmin(admin.ModelAdmin):
@@ -14,10 +14,19 @@ class CourseAdmin(admin.ModelAdmin):
 
 @admin.register(CourseAllocation)
 class CourseAllocationAdmin(admin.ModelAdmin):
-    list_display = ['course', 'get_registered_students_count']
+    list_display = ['course', 'session', 'seats_taken', 'capacity']
     list_filter = ['course__department', 'course__semester']
     search_fields = ['course__code', 'course__title']
+    readonly_fields = ['seats_taken']
 
-    def get_registered_students_count(self, obj):
-        return obj.registered_students.count()
-    get_registered_students_count.short_description = 'Registered Students'
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ['allocation', 'student', 'created_at']
+    list_filter = ['allocation__session']
+    search_fields = ['allocation__course__code', 'student__username']
+
+@admin.register(SeatHold)
+class SeatHoldAdmin(admin.ModelAdmin):
+    list_display = ['allocation', 'student', 'expires_at']
+    list_filter = ['allocation__session']
+    search_fields = ['allocation__course__code', 'student__username']
@@ -0,0 +1,76 @@
+from .current_session import get_current_session, invalidate_current_session
+from .models import CatalogVersion, CourseAllocation
+
+# Process-local payload cache; entries are only reused while CatalogVersion is unchanged
+_payloads = {}
+_payloads_version = None
+MAX_CACHED_PAYLOADS = 256
+
+# Query params the cached catalog understands; anything else takes the uncached path
+CATALOG_FILTERS = ('department', 'level', 'semester', 'is_active')
+BOOLEAN_VALUES = ('true', 'false', 'True', 'False')
+
+def catalog_key(params):
+    """Cache key for the filters in params, or None when they cannot be served from the cache."""
+    if set(params) - set(CATALOG_FILTERS):
+        return None
+    values = []
+    for name in CATALOG_FILTERS:
+        value = params.get(name, '')
+        if value and not (value in BOOLEAN_VALUES if name == 'is_active' else value.isdigit()):
+            return None
+        values.append(value)
+    return tuple(values)
+
+def get_catalog(key, build):
+    """
+    Catalog entries without the per-request fields for a filter key, built by
+    build() on a miss. Entries are keyed by (catalog version, current session,
+    filters); a version bump drops every cached entry.
+    """
+    global _payloads, _payloads_version
+    version = CatalogVersion.current()
+    if version != _payloads_version:
+        # Sessions bump the version too, so another worker may have changed the current one
+        invalidate_current_session()
+    session = get_current_session()
+    session_id = session.id if session else None
+
+    if version != _payloads_version or len(_payloads) >= MAX_CACHED_PAYLOADS:
+        _payloads = {}
+        _payloads_version = version
+    cache_key = (session_id,) + key
+    if cache_key not in _payloads:
+        _payloads[cache_key] = build()
+    return _payloads[cache_key]
+
+def add_request_fields(entries, user):
+    """Copy the cached entries, adding the fields that depend on the user and on seat counters."""
+    # Import here to avoid circular imports
+    from registration.models import RegistrationCourse
+
+    registered = set(
+        RegistrationCourse.objects.filter(
+            registration__student=user,
+            registration__status='approved'
+        ).values_list('course_id', flat=True)
+    ) if user.is_authenticated else set()
+
+    seats = {}
+    allocations = CourseAllocation.objects.filter(
+        session__is_current=True
+    ).order_by('-pk').values_list('course_id', 'seats_taken', 'capacity')
+    for course_id, seats_taken, capacity in allocations:
+        # Lowest pk wins, matching the catalog annotations
+        seats[course_id] = (seats_taken, capacity)
+
+    results = []
+    for entry in entries:
+        seats_taken, capacity = seats.get(entry['id'], (0, CourseAllocation.DEFAULT_CAPACITY))
+        results.append({
+            **entry,
+            'is_registered': entry['id'] in registered,
+            'enrolled_students': seats_taken,
+            'capacity': capacity
+        })
+    return results
@@ -0,0 +1,37 @@
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+
+def make_etag(*parts):
+    """Quoted ETag built from the cheap version values a response depends on."""
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+def conditional_get(version_func):
+    """
+    Conditional GET for APIView and ViewSet handlers.
+
+    version_func(view, request, *args, **kwargs) returns (etag, last_modified)
+    from cheap version data (a counter, a max updated_at); a request whose
+    If-None-Match or If-Modified-Since still matches gets 304 Not Modified
+    before the handler serializes anything. Responses are marked private and
+    revalidated on every use.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            etag, last_modified = version_func(view, request, *args, **kwargs)
+            last_modified = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = handler(view, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                if last_modified:
+                    response['Last-Modified'] = http_date(last_modified)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
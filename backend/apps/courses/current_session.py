@@ -0,0 +1,38 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import AcademicSession
+
+DEFAULT_TTL = timedelta(seconds=60)
+
+# Process-local (expires_at, session) pair, replaced as a whole so threads never see half an update
+_cached = (0.0, None)
+
+def get_current_session():
+    """
+    The current AcademicSession, or None, cached in this process for
+    CURRENT_SESSION_TTL. Saving or deleting a session clears the cache of the
+    worker that made the change (see courses.signals); other workers pick it up
+    when their copy expires, or sooner when they notice a catalog version bump.
+    The returned instance is shared, so treat it as read-only.
+    """
+    global _cached
+    expires_at, session = _cached
+    now = time.monotonic()
+    if now >= expires_at:
+        session = AcademicSession.objects.filter(is_current=True).first()
+        ttl = getattr(settings, 'CURRENT_SESSION_TTL', DEFAULT_TTL)
+        _cached = (now + ttl.total_seconds(), session)
+    return session
+
+def invalidate_current_session():
+    global _cached
+    _cached = (0.0, None)
+
+def registration_is_open(session, today=None):
+    """Whether today falls inside the session's registration window; uses no queries."""
+    today = today or timezone.localdate()
+    return session.registration_start_date <= today <= session.registration_end_date
@@ -0,0 +1,86 @@
+from registration.models import StudentCourseHistory
+from .models import CourseAllocation, CoursePrerequisiteClosure, SeatHold
+
+def iter_bitset(bits):
+    """Yield the course ids set in a bitset, lowest first."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+def missing_prerequisites(student, course_ids):
+    """
+    Check a whole course selection against the prerequisite closure, so
+    indirect prerequisites count too, with one closure query and one lookup of
+    the student's passed-course bitset. Returns {course_id: [codes]} for the courses whose
+    prerequisites the student has not passed.
+    """
+    passed = StudentCourseHistory.passed_for(student.pk)
+    missing = {}
+    rows = (
+        CoursePrerequisiteClosure.objects
+        .filter(course_id__in=course_ids)
+        .order_by('prerequisite__code')
+        .values_list('course_id', 'prerequisite_id', 'prerequisite__code')
+    )
+    for course_id, prerequisite_id, code in rows:
+        if not passed >> prerequisite_id & 1:
+            missing.setdefault(course_id, []).append(code)
+    return missing
+
+def catalog_eligibility(student, session):
+    """
+    Eligibility of the student for every course allocated in the session.
+
+    The seat counters, the student's enrolments and holds, their passed-course
+    bitset and the prerequisite closure are each loaded once; the rules are
+    then evaluated in memory with bitsets keyed by course id.
+    """
+    allocations = list(
+        CourseAllocation.objects.filter(session=session)
+        .order_by('course__code')
+        .values_list('id', 'course_id', 'course__code', 'course__title', 'course__units', 'seats_taken', 'capacity')
+    )
+    allocation_ids = [allocation[0] for allocation in allocations]
+    registered = set(
+        CourseAllocation.registered_students.through.objects
+        .filter(user_id=student.pk, courseallocation_id__in=allocation_ids)
+        .values_list('courseallocation_id', flat=True)
+    )
+    held = set(
+        SeatHold.objects.filter(student_id=student.pk, allocation_id__in=allocation_ids)
+        .values_list('allocation_id', flat=True)
+    )
+    passed = StudentCourseHistory.passed_for(student.pk)
+
+    required = {}
+    codes = {}
+    closure = CoursePrerequisiteClosure.objects.filter(
+        course_id__in=[allocation[1] for allocation in allocations]
+    ).values_list('course_id', 'prerequisite_id', 'prerequisite__code')
+    for course_id, prerequisite_id, code in closure:
+        required[course_id] = required.get(course_id, 0) | 1 << prerequisite_id
+        codes[prerequisite_id] = code
+
+    catalog = []
+    for allocation_id, course_id, code, title, units, seats_taken, capacity in allocations:
+        reasons = []
+        is_registered = allocation_id in registered
+        if seats_taken >= capacity and not is_registered and allocation_id not in held:
+            reasons.append('full')
+        if is_registered:
+            reasons.append('already_registered')
+        missing = required.get(course_id, 0) & ~passed
+        if missing:
+            reasons.append('missing_prerequisites')
+        catalog.append({
+            'course_id': course_id,
+            'code': code,
+            'title': title,
+            'units': units,
+            'seats_left': max(capacity - seats_taken, 0),
+            'eligible': not reasons,
+            'reasons': reasons,
+            'missing_prerequisites': sorted(codes[prerequisite_id] for prerequisite_id in iter_bitset(missing))
+        })
+    return catalog
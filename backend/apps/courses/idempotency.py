@@ -0,0 +1,83 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+DEFAULT_TTL = timedelta(hours=24)
+
+
+def get_request_hash(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+def idempotent(endpoint):
+    """
+    Replay the stored response when a request repeats an Idempotency-Key.
+
+    Successful (2xx) responses are stored per user and endpoint for
+    IDEMPOTENCY_KEY_TTL; a retry with the same key is answered from that row
+    without running the view again. Requests without the header are untouched.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = request.META.get(IDEMPOTENCY_HEADER)
+            if not key:
+                return view_method(self, request, *args, **kwargs)
+
+            if len(key) > 255:
+                return Response(
+                    {'detail': 'Idempotency-Key must be at most 255 characters'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            request_hash = get_request_hash(request)
+            stored = IdempotencyKey.objects.filter(
+                user=request.user,
+                endpoint=endpoint,
+                key=key,
+                expires_at__gt=timezone.now()
+            ).first()
+            if stored:
+                if stored.request_hash != request_hash:
+                    return Response(
+                        {'detail': 'Idempotency-Key has already been used for a different request'},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                    )
+                response = Response(stored.response, status=stored.status_code)
+                response['Idempotent-Replayed'] = 'true'
+                return response
+
+            response = view_method(self, request, *args, **kwargs)
+
+            if status.is_success(response.status_code):
+                ttl = getattr(settings, 'IDEMPOTENCY_KEY_TTL', DEFAULT_TTL)
+                try:
+                    with transaction.atomic():
+                        IdempotencyKey.objects.update_or_create(
+                            user=request.user,
+                            endpoint=endpoint,
+                            key=key,
+                            defaults={
+                                'request_hash': request_hash,
+                                'status_code': response.status_code,
+                                'response': response.data,
+                                'expires_at': timezone.now() + ttl,
+                            }
+                        )
+                except IntegrityError:
+                    # A concurrent request with the same key stored its response first
+                    pass
+            return response
+        return wrapper
+    return decorator
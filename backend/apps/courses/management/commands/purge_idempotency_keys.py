@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from courses.models import IdempotencyKey
+
+class Command(BaseCommand):
+    help = 'Delete expired idempotency keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep purging instead of exiting after one pass')
+        parser.add_argument('--interval', type=float, default=3600,
+                            help='Seconds to sleep between passes when running with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+            if deleted or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired idempotency keys'))
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
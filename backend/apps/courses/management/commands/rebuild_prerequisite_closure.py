@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from courses.models import CoursePrerequisiteClosure
+
+class Command(BaseCommand):
+    help = 'Recompute the course prerequisite closure table from the prerequisite edges'
+
+    def handle(self, *args, **options):
+        rows = CoursePrerequisiteClosure.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt prerequisite closure ({rows} rows)'))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+from courses.models import SeatHold
+
+class Command(BaseCommand):
+    help = 'Release expired seat holds and give their seats back'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep sweeping instead of exiting after one pass')
+        parser.add_argument('--interval', type=float, default=30,
+                            help='Seconds to sleep between sweeps when running with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            released = SeatHold.release_expired()
+            if released or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Released {released} expired seat holds'))
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
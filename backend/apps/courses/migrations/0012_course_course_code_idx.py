@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0011_delete_registrationdeadline'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['code', 'id'], name='course_code_idx'),
+        ),
+    ]
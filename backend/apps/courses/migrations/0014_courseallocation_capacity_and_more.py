@@ -0,0 +1,58 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_seats_taken(apps, schema_editor):
+    """
+    Count a seat for every student enrolled in the allocation or holding a
+    pending or approved RegistrationCourse for its course and session; older
+    submissions never wrote the enrollment, so it is added here as well.
+    """
+    CourseAllocation = apps.get_model('courses', 'CourseAllocation')
+    RegistrationCourse = apps.get_model('registration', 'RegistrationCourse')
+    Enrollment = CourseAllocation.registered_students.through
+
+    for allocation in CourseAllocation.objects.all():
+        enrolled = set(allocation.registered_students.values_list('pk', flat=True))
+        registered = set(
+            RegistrationCourse.objects.filter(
+                course_id=allocation.course_id,
+                registration__session_id=allocation.session_id
+            ).exclude(registration__status='rejected').values_list('registration__student_id', flat=True)
+        )
+        Enrollment.objects.bulk_create([
+            Enrollment(courseallocation_id=allocation.pk, user_id=student_id)
+            for student_id in registered - enrolled
+        ])
+        allocation.seats_taken = len(enrolled | registered)
+        allocation.capacity = max(allocation.capacity, allocation.seats_taken)
+        allocation.save(update_fields=['seats_taken', 'capacity'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0013_idempotencykey_idempotencykey_unique_idempotency_key'),
+        ('registration', '0008_outboundemail'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='courseallocation',
+            name='capacity',
+            field=models.PositiveIntegerField(default=60),
+        ),
+        migrations.AddField(
+            model_name='courseallocation',
+            name='seats_taken',
+            field=models.PositiveIntegerField(default=0, help_text='Maintained counter of registered students'),
+        ),
+        migrations.RunPython(populate_seats_taken, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='courseallocation',
+            constraint=models.CheckConstraint(check=models.Q(('seats_taken__lte', models.F('capacity'))), name='allocation_seats_within_capacity'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_closure(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    CoursePrerequisiteClosure = apps.get_model('courses', 'CoursePrerequisiteClosure')
+    requires = {}
+    for course_id, prerequisite_id in Course.prerequisites.through.objects.values_list('from_course_id', 'to_course_id'):
+        requires.setdefault(course_id, set()).add(prerequisite_id)
+
+    rows = []
+    for course_id in requires:
+        depths = {}
+        frontier = requires[course_id]
+        depth = 1
+        while frontier:
+            for prerequisite_id in frontier:
+                depths[prerequisite_id] = depth
+            frontier = {
+                next_id for prerequisite_id in frontier for next_id in requires.get(prerequisite_id, ())
+                if next_id not in depths and next_id != course_id
+            }
+            depth += 1
+        rows.extend(
+            CoursePrerequisiteClosure(course_id=course_id, prerequisite_id=prerequisite_id, depth=depth)
+            for prerequisite_id, depth in depths.items()
+        )
+    CoursePrerequisiteClosure.objects.bulk_create(rows)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0016_seathold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoursePrerequisiteClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prerequisite_closure', to='courses.course')),
+                ('prerequisite', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dependent_closure', to='courses.course')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='courseprerequisiteclosure',
+            constraint=models.UniqueConstraint(fields=('course', 'prerequisite'), name='unique_prerequisite_closure'),
+        ),
+        migrations.RunPython(populate_closure, migrations.RunPython.noop),
+    ]
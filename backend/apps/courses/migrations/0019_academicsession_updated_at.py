@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0018_catalogversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='academicsession',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0019_academicsession_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='department',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
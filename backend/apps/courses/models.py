@@ -1,5 +1,10 @@
+from collections import Counter
+
 from django.db import models
+from django.db.models import Exists, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from datetime import timedelta
 
@@ -7,10 +12,46 @@ class Department(models.Model):
     name = models.CharField(max_length=100)
     code = models.CharField(max_length=10, unique=True)
     description = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.name} ({self.code})"
 
+class CourseQuerySet(models.QuerySet):
+    def with_registration_stats(self, user=None):
+        """
+        Annotate each course with the fields CourseSerializer otherwise looks up
+        per row (is_registered_flag, enrolled_students_count, capacity_count), so
+        a catalog page costs a fixed number of queries regardless of its size.
+        """
+        # Import here to avoid circular imports
+        from registration.models import RegistrationCourse
+
+        current_allocation = CourseAllocation.objects.filter(
+            course=OuterRef('pk'),
+            session__is_current=True
+        ).order_by('pk')
+
+        queryset = self.select_related('department').prefetch_related('prerequisites').annotate(
+            enrolled_students_count=Coalesce(Subquery(current_allocation.values('seats_taken')[:1]), 0),
+            capacity_count=Coalesce(
+                Subquery(current_allocation.values('capacity')[:1]),
+                CourseAllocation.DEFAULT_CAPACITY
+            )
+        )
+
+        if user is not None and user.is_authenticated:
+            queryset = queryset.annotate(
+                is_registered_flag=Exists(
+                    RegistrationCourse.objects.filter(
+                        course=OuterRef('pk'),
+                        registration__student=user,
+                        registration__status='approved'
+                    )
+                )
+            )
+        return queryset
+
 class Course(models.Model):
     LEVEL_CHOICES = [
         (100, '100'),
@@ -35,12 +76,84 @@ class Course(models.Model):
     prerequisites = models.ManyToManyField('self', blank=True, symmetrical=False, related_name='prerequisite_for')
     is_active = models.BooleanField(default=True)
 
+    objects = CourseQuerySet.as_manager()
+
     class Meta:
         ordering = ['code']
+        indexes = [
+            models.Index(fields=['code', 'id'], name='course_code_idx'),
+        ]
 
     def __str__(self):
         return f"{self.code} - {self.title}"
 
+class CoursePrerequisiteClosure(models.Model):
+    """
+    Transitive closure of Course.prerequisites: one row for every course a course
+    depends on, directly (depth 1) or through other prerequisites. Kept in step
+    by the m2m_changed and course delete handlers in signals.py.
+    """
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='prerequisite_closure')
+    prerequisite = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='dependent_closure')
+    depth = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['course', 'prerequisite'], name='unique_prerequisite_closure'),
+        ]
+
+    def __str__(self):
+        return f"{self.course_id} requires {self.prerequisite_id} (depth {self.depth})"
+
+    @classmethod
+    def rebuild(cls, course_ids=None):
+        """
+        Recompute the closure rows of course_ids and of every course that depends
+        on them (all courses when None) from the prerequisite edges.
+        """
+        Edge = Course.prerequisites.through
+        requires = {}
+        required_by = {}
+        for course_id, prerequisite_id in Edge.objects.values_list('from_course_id', 'to_course_id'):
+            requires.setdefault(course_id, set()).add(prerequisite_id)
+            required_by.setdefault(prerequisite_id, set()).add(course_id)
+
+        if course_ids is None:
+            affected = set(Course.objects.values_list('id', flat=True))
+        else:
+            # Courses depending on a changed course inherit its prerequisites
+            affected = set()
+            pending = list(course_ids)
+            while pending:
+                course_id = pending.pop()
+                if course_id not in affected:
+                    affected.add(course_id)
+                    pending.extend(required_by.get(course_id, ()))
+
+        rows = []
+        for course_id in affected:
+            # Breadth-first, so depth is the shortest prerequisite chain
+            depths = {}
+            frontier = requires.get(course_id, set())
+            depth = 1
+            while frontier:
+                for prerequisite_id in frontier:
+                    depths[prerequisite_id] = depth
+                frontier = {
+                    next_id for prerequisite_id in frontier for next_id in requires.get(prerequisite_id, ())
+                    if next_id not in depths and next_id != course_id
+                }
+                depth += 1
+            rows.extend(
+                cls(course_id=course_id, prerequisite_id=prerequisite_id, depth=depth)
+                for prerequisite_id, depth in depths.items()
+            )
+
+        with transaction.atomic():
+            cls.objects.filter(course_id__in=affected).delete()
+            cls.objects.bulk_create(rows)
+        return len(rows)
+
 class AcademicSession(models.Model):
     name = models.CharField(max_length=20)
     start_date = models.DateField(default='2024-01-01')
@@ -48,20 +161,28 @@ class AcademicSession(models.Model):
     registration_start_date = models.DateField()
     registration_end_date = models.DateField()
     is_current = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
 
 class CourseAllocation(models.Model):
+    DEFAULT_CAPACITY = 60
+
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='courseallocations')
     session = models.ForeignKey(AcademicSession, on_delete=models.CASCADE, related_name='course_allocations')
     registered_students = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='allocated_courses')
+    capacity = models.PositiveIntegerField(default=DEFAULT_CAPACITY)
+    seats_taken = models.PositiveIntegerField(default=0, help_text="Maintained counter of registered students")
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['course__code']
         unique_together = ('course', 'session')
+        constraints = [
+            models.CheckConstraint(check=Q(seats_taken__lte=F('capacity')), name='allocation_seats_within_capacity'),
+        ]
 
     def __str__(self):
         return f"{self.course.code} - {self.course.title} ({self.session.name})"
@@ -69,34 +190,280 @@ class CourseAllocation(models.Model):
     @property
     def current_capacity(self):
         """Get the current number of registered students."""
-        return self.registered_students.count()
+        return self.seats_taken
 
     @property
     def max_capacity(self):
-        """Default maximum capacity."""
-        return 60
+        """Maximum number of students for this allocation."""
+        return self.capacity
+
+    @classmethod
+    def claim_seat(cls, allocation_id):
+        """Atomically take a seat; returns False when the allocation is full."""
+        return cls.objects.filter(pk=allocation_id, seats_taken__lt=F('capacity')).update(
+            seats_taken=F('seats_taken') + 1,
+            updated_at=timezone.now()
+        ) == 1
+
+    @classmethod
+    def release_seats(cls, allocation_id, count=1):
+        """
+        Give back seats taken with claim_seat. Freed seats go to the head of the
+        waitlist first, in the caller's transaction, so they are never up for grabs.
+        """
+        with transaction.atomic():
+            # Lock the allocation so a student cannot join the waitlist mid-release
+            cls.objects.select_for_update().filter(pk=allocation_id).values_list('pk', flat=True).first()
+            remaining = count - WaitlistEntry.promote(allocation_id, count)
+            if remaining:
+                cls.objects.filter(pk=allocation_id, seats_taken__gte=remaining).update(
+                    seats_taken=F('seats_taken') - remaining,
+                    updated_at=timezone.now()
+                )
+
+    def enroll(self, student):
+        """Claim a seat and add the student; returns (enrolled, message)."""
+        Enrollment = CourseAllocation.registered_students.through
+        with transaction.atomic():
+            # A seat held in the student's cart is already counted
+            held, _ = SeatHold.objects.filter(allocation_id=self.pk, student_id=student.pk).delete()
+            if not held and not CourseAllocation.claim_seat(self.pk):
+                return False, "Course is full"
+            try:
+                with transaction.atomic():
+                    Enrollment.objects.create(courseallocation_id=self.pk, user_id=student.pk)
+            except IntegrityError:
+                CourseAllocation.release_seats(self.pk)
+                return False, "Already registered for this course"
+            WaitlistEntry.objects.filter(allocation_id=self.pk, student_id=student.pk).delete()
+        return True, "Registered"
+
+    def withdraw(self, student):
+        """Remove the student and free their seat; returns False if they were not registered."""
+        Enrollment = CourseAllocation.registered_students.through
+        with transaction.atomic():
+            removed, _ = Enrollment.objects.filter(courseallocation_id=self.pk, user_id=student.pk).delete()
+            if removed:
+                CourseAllocation.release_seats(self.pk, removed)
+        return bool(removed)
 
     def can_register(self, student):
         """Check if a student can register for this course."""
-        if self.current_capacity >= self.max_capacity:
+        from .eligibility import missing_prerequisites
+
+        if self.seats_taken >= self.capacity:
             return False, "Course is full"
         
         if self.registered_students.filter(id=student.id).exists():
             return False, "Already registered for this course"
             
-        # Check prerequisites
-        if self.course.prerequisites.exists():
-            # Get student's completed courses from previous sessions
-            completed_courses = set(
-                CourseAllocation.objects.filter(
-                    registered_students=student,
-                    session__registration_end_date__lt=self.session.registration_start_date
-                ).values_list('course_id', flat=True)
-            )
-            
-            missing_prerequisites = self.course.prerequisites.exclude(id__in=completed_courses)
-            if missing_prerequisites.exists():
-                prereq_codes = ", ".join([c.code for c in missing_prerequisites])
-                return False, f"Missing prerequisites: {prereq_codes}"
+        # Check prerequisites, direct and indirect, against the courses the student has passed
+        missing = missing_prerequisites(student, [self.course_id]).get(self.course_id)
+        if missing:
+            return False, f"Missing prerequisites: {', '.join(missing)}"
         
         return True, "Eligible for registration"
+
+
+class CatalogVersion(models.Model):
+    """
+    Single-row counter bumped whenever catalog data (courses, departments,
+    allocations, prerequisites) changes; cached catalog payloads are keyed on it.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Catalog version {self.version}"
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(pk=1).update(version=F('version') + 1, updated_at=timezone.now()):
+            try:
+                with transaction.atomic():
+                    cls.objects.create(pk=1, version=1)
+            except IntegrityError:
+                # Created concurrently; bump the row that won
+                cls.objects.filter(pk=1).update(version=F('version') + 1, updated_at=timezone.now())
+
+
+class WaitlistEntry(models.Model):
+    """A student queued for a full allocation; entries are served in id (arrival) order."""
+    DEFAULT_CLAIM_TTL = timedelta(hours=24)
+
+    allocation = models.ForeignKey(CourseAllocation, on_delete=models.CASCADE, related_name='waitlist')
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='waitlist_entries')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['allocation', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['allocation', 'student'], name='unique_waitlist_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['allocation', 'id'], name='waitlist_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student} waiting for {self.allocation}"
+
+    @property
+    def position(self):
+        """
+        1-based place in the queue, counted on the (allocation, id) index: one
+        index range scan over the entries ahead, so it grows with the queue.
+        """
+        return WaitlistEntry.objects.filter(allocation_id=self.allocation_id, id__lte=self.id).count()
+
+    @classmethod
+    def promote(cls, allocation_id, count=1):
+        """
+        Hand up to count seats to the head of the allocation's waitlist as seat
+        holds that last WAITLIST_CLAIM_TTL, and notify the students; returns how
+        many seats were handed over. A hold that is not submitted in time expires
+        like any other, and release_expired passes its seat down the queue. Call
+        inside the transaction that freed the seats.
+        """
+        from registration.models import OutboundEmail
+
+        Enrollment = CourseAllocation.registered_students.through
+        already_enrolled = Enrollment.objects.filter(
+            courseallocation_id=OuterRef('allocation_id'),
+            user_id=OuterRef('student_id')
+        )
+        already_holding = SeatHold.objects.filter(
+            allocation_id=OuterRef('allocation_id'),
+            student_id=OuterRef('student_id')
+        )
+        with transaction.atomic():
+            entries = list(
+                cls.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(allocation_id=allocation_id)
+                .exclude(Exists(already_enrolled))
+                .exclude(Exists(already_holding))
+                .select_related('student', 'allocation__course')
+                .order_by('id')[:count]
+            )
+            if not entries:
+                return 0
+
+            expires_at = timezone.now() + getattr(settings, 'WAITLIST_CLAIM_TTL', cls.DEFAULT_CLAIM_TTL)
+            SeatHold.objects.bulk_create([
+                SeatHold(allocation_id=allocation_id, student_id=entry.student_id, expires_at=expires_at)
+                for entry in entries
+            ])
+            cls.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+            deadline = timezone.localtime(expires_at).strftime('%d %b %Y, %H:%M')
+            OutboundEmail.objects.bulk_create([
+                OutboundEmail.build(
+                    subject=f'A seat opened up in {entry.allocation.course.code}',
+                    body=(
+                        f'Dear {entry.student.get_full_name() or entry.student.username},\n\n'
+                        f'A seat in {entry.allocation.course.code} - {entry.allocation.course.title} '
+                        f'is being held for you from the waitlist until {deadline}. To keep it, '
+                        f'submit a registration that includes the course before then, or, if '
+                        f'you already have a pending registration, claim the seat to add the '
+                        f'course to it. After that the seat goes to the next student on the waitlist.'
+                    ),
+                    recipient=entry.student.email
+                )
+                for entry in entries if entry.student.email
+            ])
+        return len(entries)
+
+
+class SeatHold(models.Model):
+    """A seat claimed for a course in a student's selection cart until it expires or is submitted."""
+    DEFAULT_TTL = timedelta(minutes=15)
+
+    allocation = models.ForeignKey(CourseAllocation, on_delete=models.CASCADE, related_name='holds')
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='seat_holds')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['allocation', 'student'], name='unique_seat_hold'),
+        ]
+
+    def __str__(self):
+        return f"{self.student} holds {self.allocation} until {self.expires_at}"
+
+    @classmethod
+    def take(cls, allocation, student):
+        """Hold a seat for the student, or extend their existing hold; returns (hold, message)."""
+        expires_at = timezone.now() + getattr(settings, 'SEAT_HOLD_TTL', cls.DEFAULT_TTL)
+        with transaction.atomic():
+            # Never shortens a hold, such as a longer one handed over from the waitlist
+            if cls.objects.filter(allocation=allocation, student=student).update(
+                expires_at=Greatest(F('expires_at'), expires_at)
+            ):
+                return cls.objects.get(allocation=allocation, student=student), "Seat hold extended"
+            if allocation.registered_students.filter(pk=student.pk).exists():
+                return None, "Already registered for this course"
+
+            if not CourseAllocation.claim_seat(allocation.pk):
+                # Abandoned carts may still be holding seats the sweep has not freed yet
+                cls.release_expired(allocation_id=allocation.pk)
+                if not CourseAllocation.claim_seat(allocation.pk):
+                    return None, "Course is full"
+            try:
+                with transaction.atomic():
+                    hold = cls.objects.create(allocation=allocation, student=student, expires_at=expires_at)
+            except IntegrityError:
+                # A concurrent request from the same student took the hold first
+                CourseAllocation.release_seats(allocation.pk)
+                return cls.objects.get(allocation=allocation, student=student), "Seat hold extended"
+        return hold, "Seat held"
+
+    @classmethod
+    def release(cls, allocation, student):
+        """Drop the student's hold and free its seat; returns False if there was none."""
+        with transaction.atomic():
+            released, _ = cls.objects.filter(allocation=allocation, student=student).delete()
+            if released:
+                CourseAllocation.release_seats(allocation.pk, released)
+        return bool(released)
+
+    @classmethod
+    def release_expired(cls, allocation_id=None):
+        """
+        Delete expired holds and give their seats back with one update per
+        allocation, found through the expires_at index; returns the number released.
+        """
+        with transaction.atomic():
+            expired = cls.objects.select_for_update(skip_locked=True).filter(expires_at__lte=timezone.now())
+            if allocation_id is not None:
+                expired = expired.filter(allocation_id=allocation_id)
+            holds = list(expired.values_list('pk', 'allocation_id'))
+            if not holds:
+                return 0
+
+            cls.objects.filter(pk__in=[pk for pk, _ in holds]).delete()
+            for held_allocation_id, count in Counter(a_id for _, a_id in holds).items():
+                CourseAllocation.release_seats(held_allocation_id, count)
+        return len(holds)
+
+
+class IdempotencyKey(models.Model):
+    """Stored response for a client-supplied Idempotency-Key, replayed on retries until it expires."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='idempotency_keys')
+    endpoint = models.CharField(max_length=100)
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'endpoint', 'key'], name='unique_idempotency_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.endpoint} {self.key} ({self.user_id})"
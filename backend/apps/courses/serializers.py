@@ -1,3 +1,4 @@
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Department, Course, AcademicSession, CourseAllocation
 from users.serializers import UserSerializer
@@ -28,6 +29,10 @@ class CourseSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return False
+
+        # Precomputed by Course.objects.with_registration_stats()
+        if hasattr(obj, 'is_registered_flag'):
+            return obj.is_registered_flag
         
         # Import here to avoid circular imports
         from registration.models import RegistrationCourse, Registration
@@ -40,17 +45,16 @@ class CourseSerializer(serializers.ModelSerializer):
         ).exists()
 
     def get_enrolled_students(self, obj):
-        allocation = CourseAllocation.objects.filter(course=obj).first()
-        return allocation.registered_students.count() if allocation else 0
+        if hasattr(obj, 'enrolled_students_count'):
+            return obj.enrolled_students_count
+        allocation = CourseAllocation.objects.filter(course=obj, session__is_current=True).order_by('pk').first()
+        return allocation.seats_taken if allocation else 0
 
     def get_capacity(self, obj):
-        allocation = CourseAllocation.objects.filter(course=obj).first()
-        return 50  # Default capacity
-
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        print(f"Serializing course {instance.code}: {data}")  # Debug log
-        return data
+        if hasattr(obj, 'capacity_count'):
+            return obj.capacity_count
+        allocation = CourseAllocation.objects.filter(course=obj, session__is_current=True).order_by('pk').first()
+        return allocation.capacity if allocation else CourseAllocation.DEFAULT_CAPACITY
 
 class AcademicSessionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -61,7 +65,10 @@ class AcademicSessionSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         if attrs.get('is_current', False):
             # Ensure only one session is current
-            AcademicSession.objects.exclude(id=self.instance.id if self.instance else None).update(is_current=False)
+            AcademicSession.objects.filter(is_current=True).exclude(id=self.instance.id if self.instance else None).update(
+                is_current=False,
+                updated_at=timezone.now()
+            )
         return attrs
 
 class CourseAllocationSerializer(serializers.ModelSerializer):
@@ -71,10 +78,13 @@ class CourseAllocationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CourseAllocation
-        fields = ('id', 'course', 'department', 'session', 'max_capacity', 'current_capacity')
+        fields = ('id', 'course', 'department', 'session', 'capacity', 'seats_taken',
+                 'max_capacity', 'current_capacity')
+        read_only_fields = ('seats_taken',)
 
     def validate(self, attrs):
-        if attrs.get('max_capacity', 0) < attrs.get('current_capacity', 0):
+        seats_taken = self.instance.seats_taken if self.instance else 0
+        if attrs.get('capacity', seats_taken) < seats_taken:
             raise serializers.ValidationError(
-                {"max_capacity": "Maximum capacity cannot be less than current capacity."})
+                {"capacity": "Maximum capacity cannot be less than current capacity."})
         return attrs
\ No newline at end of file
@@ -0,0 +1,58 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .current_session import invalidate_current_session
+from .models import AcademicSession, CatalogVersion, Course, CourseAllocation, CoursePrerequisiteClosure, Department
+
+@receiver(m2m_changed, sender=Course.prerequisites.through)
+def update_prerequisite_closure(sender, instance, action, reverse, pk_set, **kwargs):
+    """Refresh the closure rows of the courses whose prerequisite edges changed."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        changed = {instance.pk}
+    elif pk_set:
+        changed = set(pk_set)
+    else:
+        # prerequisite_for.clear() does not say which courses lost the edge
+        changed = None
+    CoursePrerequisiteClosure.rebuild(changed)
+
+@receiver(pre_delete, sender=Course)
+def remember_closure_dependents(sender, instance, **kwargs):
+    """The delete cascades away the closure rows that say which courses depended on this one."""
+    instance._closure_dependents = set(
+        CoursePrerequisiteClosure.objects.filter(prerequisite=instance).values_list('course_id', flat=True)
+    )
+
+@receiver(post_delete, sender=Course)
+def rebuild_closure_of_dependents(sender, instance, **kwargs):
+    """Drop the deleted course's own prerequisites from the closure of every course that needed it."""
+    dependents = getattr(instance, '_closure_dependents', None)
+    if dependents:
+        transaction.on_commit(lambda: CoursePrerequisiteClosure.rebuild(dependents))
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=CourseAllocation)
+@receiver(post_delete, sender=CourseAllocation)
+def bump_catalog_version(sender, **kwargs):
+    """Invalidate cached catalog payloads when catalog data changes."""
+    CatalogVersion.bump()
+
+@receiver(m2m_changed, sender=Course.prerequisites.through)
+def bump_catalog_version_on_prerequisites(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        CatalogVersion.bump()
+
+@receiver(post_save, sender=AcademicSession)
+@receiver(post_delete, sender=AcademicSession)
+def invalidate_session_cache(sender, **kwargs):
+    """
+    Drop this worker's cached current session; the version bump tells the
+    other workers, whose catalog reads check CatalogVersion anyway.
+    """
+    invalidate_current_session()
+    CatalogVersion.bump()
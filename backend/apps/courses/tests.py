@@ -1,3 +1,69 @@
+import datetime
+
 from django.test import TestCase
+from users.models import User
+from .models import AcademicSession, Course, CourseAllocation, Department, SeatHold
 
 # Create your tests here.
+
+class SeatCounterTests(TestCase):
+    """seats_taken must track enrollments and holds on any database."""
+
+    def setUp(self):
+        department = Department.objects.create(name='Computer Science', code='CSC')
+        session = AcademicSession.objects.create(
+            name='2024/2025',
+            registration_start_date=datetime.date(2024, 1, 1),
+            registration_end_date=datetime.date(2030, 12, 31),
+            is_current=True
+        )
+        course = Course.objects.create(code='CSC501', title='Course', units=3, department=department)
+        self.allocation = CourseAllocation.objects.create(course=course, session=session, capacity=2)
+        self.students = [
+            User.objects.create_user(
+                username=f'student{i}', email=f'student{i}@example.com', password='password',
+                user_type='student', department=department, level=500
+            )
+            for i in range(3)
+        ]
+
+    def seats_taken(self):
+        self.allocation.refresh_from_db()
+        return self.allocation.seats_taken
+
+    def test_claim_seat_stops_at_capacity(self):
+        self.assertTrue(CourseAllocation.claim_seat(self.allocation.pk))
+        self.assertTrue(CourseAllocation.claim_seat(self.allocation.pk))
+        self.assertFalse(CourseAllocation.claim_seat(self.allocation.pk))
+        self.assertEqual(self.seats_taken(), 2)
+
+    def test_release_seats_gives_seats_back(self):
+        CourseAllocation.claim_seat(self.allocation.pk)
+        CourseAllocation.claim_seat(self.allocation.pk)
+        CourseAllocation.release_seats(self.allocation.pk, 2)
+        self.assertEqual(self.seats_taken(), 0)
+        # Never drops below zero
+        CourseAllocation.release_seats(self.allocation.pk)
+        self.assertEqual(self.seats_taken(), 0)
+
+    def test_enroll_and_withdraw_keep_the_counter_in_step(self):
+        self.assertEqual(self.allocation.enroll(self.students[0]), (True, 'Registered'))
+        self.assertEqual(self.allocation.enroll(self.students[0]), (False, 'Already registered for this course'))
+        self.assertEqual(self.allocation.enroll(self.students[1]), (True, 'Registered'))
+        self.assertEqual(self.allocation.enroll(self.students[2]), (False, 'Course is full'))
+        self.assertEqual(self.seats_taken(), 2)
+
+        self.assertTrue(self.allocation.withdraw(self.students[0]))
+        self.assertFalse(self.allocation.withdraw(self.students[0]))
+        self.assertEqual(self.seats_taken(), 1)
+        self.assertEqual(self.allocation.registered_students.count(), 1)
+
+    def test_enroll_converts_a_held_seat(self):
+        self.assertTrue(CourseAllocation.claim_seat(self.allocation.pk))
+        SeatHold.objects.create(
+            allocation=self.allocation, student=self.students[0],
+            expires_at=datetime.datetime(2030, 12, 31, tzinfo=datetime.timezone.utc)
+        )
+        self.assertEqual(self.allocation.enroll(self.students[0]), (True, 'Registered'))
+        self.assertEqual(self.seats_taken(), 1)
+        self.assertFalse(SeatHold.objects.exists())
@@ -12,6 +12,7 @@ from .views import (
     PendingRegistrationsView,
     AllRegistrationsView,
     ApproveRegistrationView,
+    BulkApproveRegistrationsView,
     EditRegistrationCoursesView,
     RegistrationDetailView,
     StudentRegistrationStatusView
@@ -30,6 +31,7 @@ urlpatterns = [
     path('sessions/', AcademicSessionListView.as_view(), name='session-list'),
     path('registrations/pending/', PendingRegistrationsView.as_view(), name='pending-registrations'),
     path('registrations/all/', AllRegistrationsView.as_view(), name='all-registrations'),
+    path('registrations/bulk_approve/', BulkApproveRegistrationsView.as_view(), name='bulk-approve-registrations'),
     path('registrations/<int:pk>/', RegistrationDetailView.as_view(), name='registration-detail'),
     path('registrations/<int:pk>/approve/', ApproveRegistrationView.as_view(), name='approve-registration'),
     path('registrations/<int:pk>/edit_courses/', EditRegistrationCoursesView.as_view(), name='edit-registration-courses'),
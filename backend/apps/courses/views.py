@@ -3,12 +3,14 @@ from rest_framework import generics, permissions, filters, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db import transaction, models
+from django.db import IntegrityError, transaction, models
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.http import Http404
-from .models import Department, Course, AcademicSession, CourseAllocation
-from registration.models import Registration, RegistrationCourse, RegistrationApproval
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from .models import Department, Course, AcademicSession, CatalogVersion, CourseAllocation, SeatHold, WaitlistEntry
+from registration.models import Registration, RegistrationCourse, RegistrationApproval, StudentCourseHistory
 from .serializers import (
     DepartmentSerializer,
     CourseSerializer,
@@ -16,10 +18,51 @@ from .serializers import (
     CourseAllocationSerializer
 )
 from registration.serializers import RegistrationSerializer, RegistrationCourseSerializer
+from registration.pagination import RegistrationCursorPagination
+from registration.services import (
+    RegistrationError,
+    add_held_course,
+    claim_registration_seats,
+    release_registration_seats,
+    submit_registration
+)
+from registration.views import RegistrationListMixin, parse_id_list
+from .catalog import add_request_fields, catalog_key, get_catalog
+from .conditional import conditional_get, make_etag
+from .current_session import get_current_session, registration_is_open
+from .eligibility import catalog_eligibility
+from .idempotency import idempotent
+from .pagination import CourseCursorPagination
 from django.db.models import Q
 
+User = get_user_model()
+
 # Create your views here.
 
+def catalog_version(view, request, *args, **kwargs):
+    """Departments only change together with the catalog version."""
+    return make_etag(CatalogVersion.current(), kwargs.get('pk'), request.GET.urlencode()), None
+
+def course_list_version(view, request, *args, **kwargs):
+    """The course list also shows the caller's registrations and the current seat counters."""
+    seats = CourseAllocation.objects.filter(session__is_current=True).aggregate(
+        changed=models.Max('updated_at'),
+        count=models.Count('id')
+    )
+    registrations = Registration.objects.filter(student=request.user).aggregate(
+        changed=models.Max('updated_at'),
+        count=models.Count('id')
+    )
+    etag = make_etag(
+        CatalogVersion.current(), request.user.pk, request.GET.urlencode(),
+        seats['changed'], seats['count'], registrations['changed'], registrations['count']
+    )
+    return etag, None
+
+def session_list_version(view, request, *args, **kwargs):
+    sessions = AcademicSession.objects.aggregate(changed=models.Max('updated_at'), count=models.Count('id'))
+    return make_etag(sessions['changed'], sessions['count'], request.GET.urlencode()), sessions['changed']
+
 class DepartmentViewSet(viewsets.ModelViewSet):
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
@@ -27,6 +70,14 @@ class DepartmentViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter]
     search_fields = ['name', 'code']
 
+    @conditional_get(catalog_version)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get(catalog_version)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def get_permissions(self):
         """
         Instantiates and returns the list of permissions required for this view.
@@ -66,10 +117,14 @@ class CourseListView(generics.ListCreateAPIView):
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = CourseCursorPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['department', 'level', 'semester', 'is_active']
     search_fields = ['code', 'title']
 
+    def get_queryset(self):
+        return Course.objects.with_registration_stats(self.request.user)
+
 class CourseDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
@@ -82,6 +137,10 @@ class AcademicSessionListView(generics.ListCreateAPIView):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['is_current']
 
+    @conditional_get(session_list_version)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
 class AcademicSessionDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = AcademicSession.objects.all()
     serializer_class = AcademicSessionSerializer
@@ -103,12 +162,27 @@ class CourseViewSet(viewsets.ModelViewSet):
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CourseCursorPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['department', 'level', 'semester', 'is_active']
     search_fields = ['code', 'title']
 
     def get_queryset(self):
-        return Course.objects.all()
+        return Course.objects.with_registration_stats(self.request.user)
+
+    @conditional_get(course_list_version)
+    def list(self, request, *args, **kwargs):
+        # Plain filtered catalog reads are served from the versioned catalog cache;
+        # searches and paginated reads go through the regular queryset
+        key = catalog_key(request.query_params)
+        if key is None:
+            return super().list(request, *args, **kwargs)
+
+        def build():
+            courses = self.filter_queryset(Course.objects.with_registration_stats())
+            return [dict(entry) for entry in CourseSerializer(courses, many=True).data]
+
+        return Response(add_request_fields(get_catalog(key, build), request.user))
 
     def get_permissions(self):
         """
@@ -134,100 +208,56 @@ class CourseViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
     @action(detail=False, methods=['post'])
+    @idempotent('courses.register_courses')
     def register_courses(self, request):
         """Register multiple courses - creates pending registration"""
-        user = request.user
-        course_ids = request.data.get('course_ids', [])
-        comments = request.data.get('comments', '')
-        
-        if not course_ids:
-            return Response(
-                {'detail': 'No courses selected'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Get current academic session
-        current_session = AcademicSession.objects.filter(is_current=True).first()
-        if not current_session:
-            return Response(
-                {'detail': 'No active academic session'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Get courses
-        courses = Course.objects.filter(id__in=course_ids)
-        if len(courses) != len(course_ids):
-            return Response(
-                {'detail': 'Some courses not found'},
-                status=status.HTTP_400_BAD_REQUEST
+        try:
+            registration, courses = submit_registration(
+                request.user,
+                request.data.get('course_ids', []),
+                request.data.get('comments', '')
             )
-        
-        # Calculate total units
-        total_units = sum(course.units for course in courses)
-        if total_units > 24:
+        except RegistrationError as e:
             return Response(
-                {'detail': f'Maximum units (24) exceeded. Selected courses total {total_units} units.'},
+                {'detail': e.detail},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Clean up any empty registrations (with 0 total units) first
-        Registration.objects.filter(
-            student=user,
-            session=current_session,
-            semester='2',
-            total_units=0
-        ).delete()
-        
-        # Check if user already has a pending/approved registration for this session
-        # Only consider registrations with courses (total_units > 0)
-        existing_registration = Registration.objects.filter(
-            student=user,
-            session=current_session,
-            semester='2',  # Current semester (Second Semester)
-            total_units__gt=0  # Only consider registrations with courses
-        ).first()
-        
-        if existing_registration:
-            if existing_registration.status == 'approved':
-                return Response(
-                    {'detail': 'You already have an approved registration for this session'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            elif existing_registration.status == 'pending':
-                return Response(
-                    {'detail': 'You already have a pending registration. Please wait for approval.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        
-        # Create registration with atomic transaction
-        with transaction.atomic():
-            # Create registration
-            registration = Registration.objects.create(
-                student=user,
-                session=current_session,
-                department=user.department,
-                level=user.level or 500,  # Default to 500 for graduate level
-                semester='2',  # Current semester (Second Semester)
-                status='pending',
-                total_units=total_units,
-                comments=comments
-            )
-            
-            # Add courses to registration
-            for course in courses:
-                RegistrationCourse.objects.create(
-                    registration=registration,
-                    course=course
-                )
-        
         return Response({
             'detail': 'Course registration submitted successfully. Status: Pending approval.',
             'registration_id': registration.id,
             'status': 'pending',
-            'total_units': total_units,
+            'total_units': registration.total_units,
             'courses': [{'id': course.id, 'code': course.code, 'title': course.title} for course in courses]
         }, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['get'])
+    def eligibility(self, request):
+        """Whether the student can take each course on offer this session, and why not"""
+        user = request.user
+        student = user
+        if request.query_params.get('student'):
+            # Officers can look at a student's eligibility on their behalf
+            if not (user.user_type in ['registration_officer', 'hod', 'school_officer'] or user.is_staff):
+                return Response(
+                    {'detail': 'Permission denied'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            student = get_object_or_404(User, pk=request.query_params['student'], user_type='student')
+
+        session = get_current_session()
+        if not session:
+            return Response(
+                {'detail': 'No active academic session'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'student_id': student.id,
+            'session_id': session.id,
+            'courses': catalog_eligibility(student, session)
+        })
+
     @action(detail=True, methods=['post'])
     def register(self, request, pk=None):
         course = self.get_object()
@@ -250,9 +280,26 @@ class CourseViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Register the course
-        allocation, created = CourseAllocation.objects.get_or_create(course=course)
-        allocation.registered_students.add(user)
+        # Register the course in the current session's allocation
+        session = get_current_session()
+        allocation = CourseAllocation.objects.filter(course=course, session=session).first() if session else None
+        if not allocation:
+            return Response(
+                {'detail': 'Course is not offered in the current session'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not registration_is_open(session):
+            return Response(
+                {'detail': 'Registration is not open for this session'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        enrolled, message = allocation.enroll(user)
+        if not enrolled:
+            return Response(
+                {'detail': message},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         return Response(
             {'detail': 'Course registered successfully'},
@@ -267,7 +314,7 @@ class CourseViewSet(viewsets.ModelViewSet):
         try:
             allocation = CourseAllocation.objects.filter(course=course, registered_students=user).first()
             if allocation:
-                allocation.registered_students.remove(user)
+                allocation.withdraw(user)
                 return Response(
                     {'detail': 'Course unregistered successfully'},
                     status=status.HTTP_200_OK
@@ -282,6 +329,162 @@ class CourseViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+    @action(detail=True, methods=['get', 'post', 'delete'])
+    def waitlist(self, request, pk=None):
+        """Show (GET), join (POST) or leave (DELETE) the waitlist of a full course"""
+        course = self.get_object()
+        user = request.user
+
+        session = get_current_session()
+        allocation = CourseAllocation.objects.filter(course=course, session=session).first() if session else None
+        if not allocation:
+            return Response(
+                {'detail': 'Course is not offered in the current session'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if request.method == 'DELETE':
+            removed, _ = WaitlistEntry.objects.filter(allocation=allocation, student=user).delete()
+            if not removed:
+                return Response(
+                    {'detail': 'Not on the waitlist for this course'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return Response({'detail': 'Left the waitlist'}, status=status.HTTP_200_OK)
+
+        if request.method == 'POST':
+            if user.user_type != 'student':
+                return Response(
+                    {'detail': 'Only students can join a waitlist'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            if not registration_is_open(session):
+                return Response(
+                    {'detail': 'Registration is not open for this session'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            with transaction.atomic():
+                # Same lock as seat releases, so a seat cannot free up unseen while joining
+                allocation = CourseAllocation.objects.select_for_update().get(pk=allocation.pk)
+                if allocation.registered_students.filter(pk=user.pk).exists():
+                    return Response(
+                        {'detail': 'Already registered for this course'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                if allocation.seats_taken < allocation.capacity:
+                    return Response(
+                        {'detail': 'Course has free seats; register for it instead'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                try:
+                    with transaction.atomic():
+                        WaitlistEntry.objects.create(allocation=allocation, student=user)
+                except IntegrityError:
+                    return Response(
+                        {'detail': 'Already on the waitlist for this course'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+        entry = WaitlistEntry.objects.filter(allocation=allocation, student=user).first()
+        if not entry:
+            return Response(
+                {'detail': 'Not on the waitlist for this course'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response({
+            'course_code': course.code,
+            'position': entry.position,
+            'joined_at': entry.created_at
+        }, status=status.HTTP_201_CREATED if request.method == 'POST' else status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post', 'delete'])
+    def hold(self, request, pk=None):
+        """Hold a seat while the course is in the selection cart (POST) or drop it (DELETE)"""
+        course = self.get_object()
+        user = request.user
+
+        session = get_current_session()
+        allocation = CourseAllocation.objects.filter(course=course, session=session).first() if session else None
+        if not allocation:
+            # Submissions treat courses without an allocation as uncapped, so there is no seat to hold
+            return Response(
+                {'detail': 'Course has no seat limit', 'course_id': course.id, 'course_code': course.code},
+                status=status.HTTP_200_OK
+            )
+
+        if request.method == 'DELETE':
+            if not SeatHold.release(allocation, user):
+                return Response(
+                    {'detail': 'No seat held for this course'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return Response({'detail': 'Seat released'}, status=status.HTTP_200_OK)
+
+        if user.user_type != 'student':
+            return Response(
+                {'detail': 'Only students can hold seats'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        if not registration_is_open(session):
+            return Response(
+                {'detail': 'Registration is not open for this session'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        hold, message = SeatHold.take(allocation, user)
+        if not hold:
+            return Response(
+                {'detail': message},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({
+            'detail': message,
+            'course_id': course.id,
+            'course_code': course.code,
+            'expires_at': hold.expires_at
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'])
+    def claim(self, request, pk=None):
+        """Add a course whose seat is held for the student (e.g. from the waitlist) to their pending registration"""
+        course = self.get_object()
+        if request.user.user_type != 'student':
+            return Response(
+                {'detail': 'Only students can claim seats'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            registration = add_held_course(request.user, course)
+        except RegistrationError as e:
+            return Response(
+                {'detail': e.detail},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({
+            'detail': f'{course.code} added to your registration',
+            'registration_id': registration.id,
+            'status': registration.status,
+            'total_units': registration.total_units
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'])
+    def holds(self, request):
+        """Seats currently held in the student's selection cart"""
+        holds = SeatHold.objects.filter(
+            student=request.user,
+            expires_at__gt=timezone.now()
+        ).values('allocation__course_id', 'allocation__course__code', 'expires_at')
+        return Response([
+            {
+                'course_id': hold['allocation__course_id'],
+                'course_code': hold['allocation__course__code'],
+                'expires_at': hold['expires_at']
+            }
+            for hold in holds
+        ])
+
     @action(detail=True, methods=['post'])
     def deregister_approved_course(self, request, pk=None):
         """Deregister from an approved course in the new registration system"""
@@ -304,7 +507,8 @@ class CourseViewSet(viewsets.ModelViewSet):
         registration = registration_course.registration
         
         with transaction.atomic():
-            # Remove the course from registration
+            # Remove the course from registration and free its seat
+            release_registration_seats([registration], course_ids=[course.id])
             registration_course.delete()
             
             # Recalculate total units
@@ -335,37 +539,33 @@ class CourseViewSet(viewsets.ModelViewSet):
         }, status=status.HTTP_200_OK)
 
 # New Registration Management Views
-class PendingRegistrationsView(generics.ListAPIView):
+class PendingRegistrationsView(RegistrationListMixin, generics.ListAPIView):
     """View for admins to see pending registrations"""
     serializer_class = RegistrationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RegistrationCursorPagination
     
     def get_queryset(self):
         user = self.request.user
         # Only allow registration officers and admin to see pending registrations
         if user.user_type in ['registration_officer', 'hod'] or user.is_staff:
-            return Registration.objects.filter(status='pending').order_by('-submitted_at')
+            return self.with_query_plan(Registration.objects.filter(status='pending').order_by('-submitted_at'))
         return Registration.objects.none()
 
-class AllRegistrationsView(generics.ListAPIView):
+class AllRegistrationsView(RegistrationListMixin, generics.ListAPIView):
     """View for admins to see all registrations (pending, approved, rejected)"""
     serializer_class = RegistrationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RegistrationCursorPagination
+    keyset_ordering = ('status_rank', '-submitted_at', '-id')
     
     def get_queryset(self):
         user = self.request.user
         # Only allow registration officers and admin to see all registrations
         if user.user_type in ['registration_officer', 'hod'] or user.is_staff:
             # Return all registrations ordered by status (pending first) then by date
-            return Registration.objects.all().order_by(
-                models.Case(
-                    models.When(status='pending', then=1),
-                    models.When(status='approved', then=2),
-                    models.When(status='rejected', then=3),
-                    default=4,
-                    output_field=models.IntegerField()
-                ),
-                '-submitted_at'
+            return self.with_query_plan(Registration.objects.all()).order_by(
+                'status_rank', '-submitted_at', '-id'
             )
         return Registration.objects.none()
 
@@ -388,23 +588,38 @@ class ApproveRegistrationView(generics.UpdateAPIView):
         action = request.data.get('action')  # 'approve' or 'reject'
         comments = request.data.get('comments', '')
         
-        if action == 'approve':
-            registration.status = 'approved'
-            # Create approval record
-            RegistrationApproval.objects.create(
-                registration=registration,
-                approved_by=user,
-                comments=comments
-            )
-        elif action == 'reject':
-            registration.status = 'rejected'
-        else:
+        if action not in ('approve', 'reject'):
             return Response(
                 {'detail': 'Invalid action. Use "approve" or "reject"'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        registration.save()
+
+        with transaction.atomic():
+            if action == 'approve':
+                if registration.status == 'rejected':
+                    # A rejected registration gave its seats back; take them again
+                    courses = Course.objects.filter(registrationcourse__registration=registration)
+                    try:
+                        claim_registration_seats(registration.student, registration.session, courses)
+                    except RegistrationError as e:
+                        transaction.set_rollback(True)
+                        return Response(
+                            {'detail': e.detail},
+                            status=status.HTTP_400_BAD_REQUEST
+                        )
+                registration.status = 'approved'
+                # Create approval record
+                RegistrationApproval.objects.create(
+                    registration=registration,
+                    approved_by=user,
+                    comments=comments
+                )
+            else:
+                if registration.status != 'rejected':
+                    release_registration_seats([registration])
+                registration.status = 'rejected'
+
+            registration.save()
         
         return Response({
             'detail': f'Registration {action}d successfully',
@@ -412,6 +627,129 @@ class ApproveRegistrationView(generics.UpdateAPIView):
             'status': registration.status
         })
 
+class BulkApproveRegistrationsView(generics.GenericAPIView):
+    """View for admins to approve or reject many registrations at once"""
+    permission_classes = [permissions.IsAuthenticated]
+    filter_fields = ('department', 'level', 'session', 'semester', 'status')
+
+    def post(self, request):
+        user = request.user
+        # Only allow registration officers and admin to approve
+        if not (user.user_type in ['registration_officer', 'hod'] or user.is_staff):
+            return Response(
+                {'detail': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        action = request.data.get('action')  # 'approve' or 'reject'
+        comments = request.data.get('comments', '')
+        registration_ids = request.data.get('registration_ids')
+        filters = request.data.get('filter')
+
+        if action not in ('approve', 'reject'):
+            return Response(
+                {'detail': 'Invalid action. Use "approve" or "reject"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if registration_ids not in (None, []):
+            registration_ids = parse_id_list(registration_ids)
+            if registration_ids is None:
+                return Response(
+                    {'detail': 'registration_ids must be a list of integers'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            queryset = Registration.objects.filter(id__in=registration_ids)
+        elif isinstance(filters, dict) and filters:
+            unknown = set(filters) - set(self.filter_fields)
+            if unknown:
+                return Response(
+                    {'detail': f'Unsupported filter(s): {", ".join(sorted(unknown))}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            cleaned = {}
+            for name, value in filters.items():
+                field = Registration._meta.get_field(name)
+                try:
+                    value = field.to_python(value)
+                except ValidationError:
+                    value = None
+                if value is None or (field.choices and value not in dict(field.choices)):
+                    return Response(
+                        {'detail': f'Invalid value for filter {name}: {filters[name]!r}'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                cleaned[name] = value
+            # Filter-based batches only touch pending registrations unless told otherwise
+            queryset = Registration.objects.filter(**{'status': 'pending', **cleaned})
+        else:
+            return Response(
+                {'detail': 'Provide registration_ids or a filter'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        new_status = 'approved' if action == 'approve' else 'rejected'
+
+        with transaction.atomic():
+            current_status = dict(queryset.select_for_update().values_list('id', 'status'))
+            changed_ids = [pk for pk, old_status in current_status.items() if old_status != new_status]
+
+            full = {}
+            if action == 'reject':
+                release_registration_seats(changed_ids)
+            else:
+                # Rejected registrations gave their seats back and must claim them again
+                reclaim = Registration.objects.filter(
+                    id__in=[pk for pk in changed_ids if current_status[pk] == 'rejected']
+                ).select_related('student', 'session')
+                for registration in reclaim:
+                    courses = Course.objects.filter(registrationcourse__registration=registration)
+                    try:
+                        with transaction.atomic():
+                            claim_registration_seats(registration.student, registration.session, courses)
+                    except RegistrationError as e:
+                        full[registration.id] = e.detail
+                changed_ids = [pk for pk in changed_ids if pk not in full]
+
+            Registration.objects.filter(id__in=changed_ids).update(
+                status=new_status,
+                status_rank=Registration.get_status_rank(new_status),
+                updated_at=timezone.now()
+            )
+            if action == 'approve':
+                RegistrationApproval.objects.bulk_create([
+                    RegistrationApproval(registration_id=pk, approved_by=user, comments=comments)
+                    for pk in changed_ids
+                ])
+
+        if not registration_ids:
+            registration_ids = list(current_status)
+        changed = set(changed_ids)
+        results = []
+        for pk in registration_ids:
+            if pk not in current_status:
+                outcome = 'not_found'
+            elif pk in full:
+                outcome = 'course_full'
+            elif pk in changed:
+                outcome = new_status
+            else:
+                outcome = f'already_{new_status}'
+            result = {
+                'registration_id': pk,
+                'outcome': outcome,
+                'status': current_status[pk] if pk in full else new_status if pk in current_status else None
+            }
+            if pk in full:
+                result['detail'] = full[pk]
+            results.append(result)
+
+        return Response({
+            'detail': f'{len(changed_ids)} registration(s) {new_status} successfully',
+            'updated': len(changed_ids),
+            'results': results
+        })
+
 class EditRegistrationCoursesView(generics.UpdateAPIView):
     """View for admins to edit courses in a registration"""
     queryset = Registration.objects.all()
@@ -450,37 +788,42 @@ class EditRegistrationCoursesView(generics.UpdateAPIView):
             )
         
         with transaction.atomic():
+            existing_course_ids = set(
+                RegistrationCourse.objects.filter(registration=registration).values_list('course_id', flat=True)
+            )
             if action == 'replace':
-                # Remove all existing courses and add new ones
-                RegistrationCourse.objects.filter(registration=registration).delete()
-                
-                for course in courses:
-                    RegistrationCourse.objects.create(
-                        registration=registration,
-                        course=course,
-                        is_carry_over=False  # Admin can manually set this if needed
-                    )
-                
-            elif action == 'add':
-                # Add new courses to existing ones
-                existing_course_ids = RegistrationCourse.objects.filter(
-                    registration=registration
-                ).values_list('course_id', flat=True)
-                
-                for course in courses:
-                    if course.id not in existing_course_ids:
-                        RegistrationCourse.objects.create(
-                            registration=registration,
-                            course=course,
-                            is_carry_over=False
-                        )
-                
+                removed_ids = existing_course_ids - {course.id for course in courses}
             elif action == 'remove':
-                # Remove specified courses
-                RegistrationCourse.objects.filter(
+                removed_ids = existing_course_ids & set(course_ids)
+            else:
+                removed_ids = set()
+            added_courses = [] if action == 'remove' else [
+                course for course in courses if course.id not in existing_course_ids
+            ]
+
+            # Rejected registrations hold no seats; everything else keeps seats in step
+            if registration.status != 'rejected':
+                release_registration_seats([registration], course_ids=removed_ids)
+                try:
+                    claim_registration_seats(registration.student, registration.session, added_courses)
+                except RegistrationError as e:
+                    transaction.set_rollback(True)
+                    return Response(
+                        {'detail': e.detail},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+            RegistrationCourse.objects.filter(
+                registration=registration,
+                course_id__in=removed_ids
+            ).delete()
+            carry_overs = StudentCourseHistory.carry_overs_for(registration.student_id) if added_courses else 0
+            for course in added_courses:
+                RegistrationCourse.objects.create(
                     registration=registration,
-                    course_id__in=course_ids
-                ).delete()
+                    course=course,
+                    is_carry_over=bool(carry_overs >> course.id & 1)  # Admin can still change this by hand
+                )
             
             # Recalculate total units
             total_units = sum(
@@ -490,6 +833,7 @@ class EditRegistrationCoursesView(generics.UpdateAPIView):
             
             # Check unit limit
             if total_units > 24:
+                transaction.set_rollback(True)
                 return Response(
                     {'detail': f'Maximum units (24) exceeded. Total units would be {total_units}.'},
                     status=status.HTTP_400_BAD_REQUEST
@@ -510,6 +854,9 @@ class RegistrationDetailView(generics.RetrieveAPIView):
     queryset = Registration.objects.all()
     serializer_class = RegistrationSerializer
     permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Registration.objects.with_serializer_plan(self.request.user)
     
     def get_object(self):
         user = self.request.user
@@ -519,15 +866,16 @@ class RegistrationDetailView(generics.RetrieveAPIView):
         
         return super().get_object()
 
-class StudentRegistrationStatusView(generics.ListAPIView):
+class StudentRegistrationStatusView(RegistrationListMixin, generics.ListAPIView):
     """View for students to see their registration status"""
     serializer_class = RegistrationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RegistrationCursorPagination
     
     def get_queryset(self):
         user = self.request.user
         if user.user_type == 'student':
-            return Registration.objects.filter(student=user).order_by('-submitted_at')
+            return self.with_query_plan(Registration.objects.filter(student=user).order_by('-submitted_at'))
         return Registration.objects.none()
 
 class CourseAllocationViewSet(viewsets.ModelViewSet):
@@ -543,6 +891,6 @@ class RegisteredCoursesViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        return Course.objects.filter(
+        return Course.objects.with_registration_stats(user).filter(
             courseallocations__registered_students=user
         )
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Registration, RegistrationCourse, RegistrationApproval, Result
+from .models import Registration, RegistrationCourse, RegistrationApproval, Result, OutboundEmail
 
 class RegistrationCourseInline(admin.TabularInline):
     model = RegistrationCourse
@@ -41,3 +41,10 @@ class ResultAdmin(admin.ModelAdmin):
         if obj:  # Editing an existing object
             return ('student', 'course', 'session')
         return ()
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient', 'subject')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
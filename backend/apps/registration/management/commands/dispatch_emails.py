@@ -0,0 +1,96 @@
+import time
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from registration.models import OutboundEmail
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbound emails in batches over a single mail connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Maximum number of emails sent per batch')
+        parser.add_argument('--max-attempts', type=int, default=5,
+                            help='Give up on an email after this many failed attempts')
+        parser.add_argument('--backoff', type=int, default=60,
+                            help='Base retry delay in seconds, doubled after every failure')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling the outbox instead of exiting when it is empty')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Seconds to sleep between polls when running with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, retried, failed = self.dispatch_batch(
+                options['batch_size'], options['max_attempts'], options['backoff']
+            )
+            if sent or retried or failed:
+                self.stdout.write(f'Sent {sent}, retrying {retried}, failed {failed}')
+
+            if not options['loop']:
+                break
+            # Drain the backlog without pausing; only sleep when the outbox is idle
+            if sent + retried + failed < options['batch_size']:
+                time.sleep(options['interval'])
+
+    def dispatch_batch(self, batch_size, max_attempts, backoff):
+        now = timezone.now()
+        sent = retried = failed = 0
+
+        with transaction.atomic():
+            # skip_locked lets several dispatchers drain the outbox side by side
+            batch = list(
+                OutboundEmail.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', next_attempt_at__lte=now)
+                .order_by('next_attempt_at', 'id')[:batch_size]
+            )
+            if not batch:
+                return sent, retried, failed
+
+            connection = get_connection(fail_silently=False)
+            try:
+                connection.open()
+                connection_error = None
+            except Exception as e:
+                connection_error = e
+
+            for email in batch:
+                error = connection_error
+                if error is None:
+                    try:
+                        EmailMessage(
+                            subject=email.subject,
+                            body=email.body,
+                            from_email=email.from_email,
+                            to=[email.recipient],
+                            connection=connection
+                        ).send()
+                    except Exception as e:
+                        error = e
+
+                email.attempts += 1
+                if error is None:
+                    email.status = 'sent'
+                    email.sent_at = timezone.now()
+                    email.last_error = ''
+                    sent += 1
+                elif email.attempts >= max_attempts:
+                    email.status = 'failed'
+                    email.last_error = str(error)
+                    failed += 1
+                else:
+                    email.next_attempt_at = now + timedelta(seconds=backoff * 2 ** (email.attempts - 1))
+                    email.last_error = str(error)
+                    retried += 1
+
+            if connection_error is None:
+                connection.close()
+
+            OutboundEmail.objects.bulk_update(
+                batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+            )
+
+        return sent, retried, failed
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from registration.models import StudentCourseHistory
+
+class Command(BaseCommand):
+    help = 'Recompute every student\'s passed and failed course bitsets from their results'
+
+    def handle(self, *args, **options):
+        students = StudentCourseHistory.refresh()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt course history for {students} students'))
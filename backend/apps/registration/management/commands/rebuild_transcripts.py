@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from registration.models import StudentTranscript
+
+class Command(BaseCommand):
+    help = 'Recompute every student\'s GPA transcript from their results'
+
+    def handle(self, *args, **options):
+        students = StudentTranscript.refresh()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt transcripts for {students} students'))
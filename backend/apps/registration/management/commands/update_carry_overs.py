@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from courses.models import AcademicSession
+from registration.services import mark_carry_overs
+
+class Command(BaseCommand):
+    help = 'Flag registered courses that are carry-overs of failed results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--session', type=int,
+                            help='Academic session id (defaults to the current session)')
+
+    def handle(self, *args, **options):
+        if options['session']:
+            session = AcademicSession.objects.filter(pk=options['session']).first()
+        else:
+            session = AcademicSession.objects.filter(is_current=True).first()
+        if not session:
+            raise CommandError('No such academic session')
+
+        marked, cleared = mark_carry_overs(session)
+        self.stdout.write(self.style.SUCCESS(
+            f'{session.name}: marked {marked} carry-over course(s), cleared {cleared}'
+        ))
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0012_course_course_code_idx'),
+        ('registration', '0004_registrationsignature'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['submitted_at', 'id'], name='registration_submitted_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+SIGNATURE_ORDER = ('registration_officer', 'hod', 'school_officer')
+STATUS_RANKS = {'pending': 1, 'approved': 2, 'rejected': 3}
+
+
+def populate_status_rank_and_signature_stage(apps, schema_editor):
+    Registration = apps.get_model('registration', 'Registration')
+    RegistrationSignature = apps.get_model('registration', 'RegistrationSignature')
+
+    for status, rank in STATUS_RANKS.items():
+        Registration.objects.filter(status=status).update(status_rank=rank)
+
+    signer_roles = {}
+    for registration_id, user_type in RegistrationSignature.objects.values_list(
+        'registration_id', 'signed_by__user_type'
+    ):
+        signer_roles.setdefault(registration_id, set()).add(user_type)
+
+    for registration_id, roles in signer_roles.items():
+        stage = 0
+        for role in SIGNATURE_ORDER:
+            if role not in roles:
+                break
+            stage += 1
+        Registration.objects.filter(pk=registration_id).update(signature_stage=stage)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0012_course_course_code_idx'),
+        ('registration', '0005_registration_registration_submitted_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registration',
+            name='signature_stage',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Number of officers that have signed, in signature order'),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='status_rank',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, help_text='Maintained from status'),
+        ),
+        migrations.RunPython(populate_status_rank_and_signature_stage, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['status_rank', '-submitted_at', '-id'], name='registration_status_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['signature_stage', 'department'], name='registration_sig_stage_idx'),
+        ),
+    ]
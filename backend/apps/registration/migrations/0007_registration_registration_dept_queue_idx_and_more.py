@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0012_course_course_code_idx'),
+        ('registration', '0006_registration_signature_stage_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(condition=models.Q(('status', 'approved')), fields=['signature_stage', 'department', 'submitted_at', 'id'], name='registration_dept_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(condition=models.Q(('status', 'approved')), fields=['signature_stage', 'submitted_at', 'id'], name='registration_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_course_history(apps, schema_editor):
+    Result = apps.get_model('registration', 'Result')
+    StudentCourseHistory = apps.get_model('registration', 'StudentCourseHistory')
+    passed = {}
+    for student_id, course_id in Result.objects.exclude(grade='F').values_list('student_id', 'course_id'):
+        passed[student_id] = passed.get(student_id, 0) | 1 << course_id
+    StudentCourseHistory.objects.bulk_create([
+        StudentCourseHistory(student_id=student_id, passed=bits.to_bytes((bits.bit_length() + 7) // 8, 'little'))
+        for student_id, bits in passed.items()
+    ])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registration', '0008_outboundemail'),
+        ('users', '0008_user_signature'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentCourseHistory',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='course_history', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('passed', models.BinaryField(default=b'')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(populate_course_history, migrations.RunPython.noop),
+    ]
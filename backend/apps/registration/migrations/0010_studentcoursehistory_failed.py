@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:22
+
+from django.db import migrations, models
+
+
+def populate_failed(apps, schema_editor):
+    Result = apps.get_model('registration', 'Result')
+    StudentCourseHistory = apps.get_model('registration', 'StudentCourseHistory')
+    failed = {}
+    for student_id, course_id in Result.objects.filter(grade='F').values_list('student_id', 'course_id'):
+        failed[student_id] = failed.get(student_id, 0) | 1 << course_id
+    for student_id, bits in failed.items():
+        StudentCourseHistory.objects.update_or_create(
+            student_id=student_id,
+            defaults={'failed': bits.to_bytes((bits.bit_length() + 7) // 8, 'little')}
+        )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registration', '0009_studentcoursehistory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentcoursehistory',
+            name='failed',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(populate_failed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:23
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registration', '0010_studentcoursehistory_failed'),
+        ('users', '0008_user_signature'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentTranscript',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='transcript', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_units', models.PositiveIntegerField(default=0)),
+                ('quality_points', models.PositiveIntegerField(default=0)),
+                ('cgpa', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=3)),
+                ('sessions', models.JSONField(default=list, help_text='Per-session units, quality points and GPA, oldest first')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
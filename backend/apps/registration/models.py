@@ -1,14 +1,52 @@
-from django.db import models
+from bisect import bisect_right
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import models, transaction
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from users.models import User
 from courses.models import Course, AcademicSession, Department
 
+# Officers must sign an approved registration in this order
+SIGNATURE_ORDER = ('registration_officer', 'hod', 'school_officer')
+
+def get_signature_stage(signer_roles):
+    """Number of officers, in SIGNATURE_ORDER, that have signed so far."""
+    stage = 0
+    for role in SIGNATURE_ORDER:
+        if role not in signer_roles:
+            break
+        stage += 1
+    return stage
+
+class RegistrationQuerySet(models.QuerySet):
+    def with_serializer_plan(self, user=None):
+        """Load everything RegistrationSerializer renders in a fixed number of queries."""
+        return self.select_related('student__department', 'department', 'session').prefetch_related(
+            models.Prefetch('courses', queryset=RegistrationCourse.objects.order_by('pk')),
+            models.Prefetch('courses__course', queryset=Course.objects.with_registration_stats(user)),
+            models.Prefetch('approvals', queryset=RegistrationApproval.objects.select_related('approved_by__department')),
+            models.Prefetch('signatures', queryset=RegistrationSignature.objects.select_related('signed_by__department')),
+        )
+
+    def with_summary_plan(self):
+        """Load what RegistrationSummarySerializer renders."""
+        return self.select_related('student', 'department', 'session').prefetch_related(
+            models.Prefetch('courses', queryset=RegistrationCourse.objects.select_related('course').order_by('pk')),
+        )
+
 class Registration(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
         ('approved', 'Approved'),
         ('rejected', 'Rejected'),
     )
+    # Sort key for officer queues: pending first, then approved, then rejected
+    STATUS_RANKS = {
+        'pending': 1,
+        'approved': 2,
+        'rejected': 3,
+    }
 
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='registrations')
     session = models.ForeignKey(AcademicSession, on_delete=models.CASCADE)
@@ -20,13 +58,54 @@ class Registration(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     total_units = models.IntegerField(default=0)
     comments = models.TextField(blank=True, null=True, help_text="Optional comments from student for registration officer")
+    status_rank = models.PositiveSmallIntegerField(default=1, editable=False, help_text="Maintained from status")
+    signature_stage = models.PositiveSmallIntegerField(default=0, editable=False, help_text="Number of officers that have signed, in signature order")
+
+    objects = RegistrationQuerySet.as_manager()
 
     class Meta:
         unique_together = ('student', 'session', 'semester')
+        indexes = [
+            models.Index(fields=['submitted_at', 'id'], name='registration_submitted_idx'),
+            models.Index(fields=['status_rank', '-submitted_at', '-id'], name='registration_status_rank_idx'),
+            models.Index(fields=['signature_stage', 'department'], name='registration_sig_stage_idx'),
+            # Officer signature queues only ever look at approved registrations
+            models.Index(
+                fields=['signature_stage', 'department', 'submitted_at', 'id'],
+                condition=models.Q(status='approved'),
+                name='registration_dept_queue_idx'
+            ),
+            models.Index(
+                fields=['signature_stage', 'submitted_at', 'id'],
+                condition=models.Q(status='approved'),
+                name='registration_queue_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student.username} - {self.session.name} ({self.get_semester_display()} Semester)"
 
+    @classmethod
+    def get_status_rank(cls, status):
+        return cls.STATUS_RANKS.get(status, len(cls.STATUS_RANKS) + 1)
+
+    def save(self, *args, **kwargs):
+        self.status_rank = self.get_status_rank(self.status)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'status_rank'}
+        super().save(*args, **kwargs)
+
+    def refresh_signature_stage(self):
+        """Recompute signature_stage from the signatures on this registration."""
+        signer_roles = set(self.signatures.values_list('signed_by__user_type', flat=True))
+        self.signature_stage = get_signature_stage(signer_roles)
+        self.updated_at = timezone.now()
+        Registration.objects.filter(pk=self.pk).update(
+            signature_stage=self.signature_stage,
+            updated_at=self.updated_at
+        )
+
 class RegistrationCourse(models.Model):
     registration = models.ForeignKey(Registration, on_delete=models.CASCADE, related_name='courses')
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
@@ -62,6 +141,22 @@ class RegistrationSignature(models.Model):
     def __str__(self):
         return f"{self.registration.student.username}'s registration signed by {self.signed_by.username}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.registration.refresh_signature_stage()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.registration.refresh_signature_stage()
+        return result
+
+class ResultQuerySet(models.QuerySet):
+    def with_serializer_plan(self, user=None):
+        """Load everything ResultSerializer renders in a fixed number of queries."""
+        return self.select_related('student__department', 'session').prefetch_related(
+            models.Prefetch('course', queryset=Course.objects.with_registration_stats(user)),
+        )
+
 class Result(models.Model):
     GRADE_CHOICES = (
         ('A', 'A'),
@@ -77,9 +172,242 @@ class Result(models.Model):
     session = models.ForeignKey(AcademicSession, on_delete=models.CASCADE)
     grade = models.CharField(max_length=1, choices=GRADE_CHOICES)
     score = models.DecimalField(max_digits=5, decimal_places=2, validators=[MinValueValidator(0), MaxValueValidator(100)])
+
+    # Lowest score for each grade above F, and the grades they open, lowest first
+    GRADE_BOUNDARIES = (40, 45, 50, 60, 70)
+    GRADES_BY_BAND = 'FEDCBA'
+
+    # Five-point scale used for GPA
+    GRADE_POINTS = {
+        'A': 5,
+        'B': 4,
+        'C': 3,
+        'D': 2,
+        'E': 1,
+        'F': 0,
+    }
+
+    objects = ResultQuerySet.as_manager()
     
     class Meta:
         unique_together = ('student', 'course', 'session')
 
     def __str__(self):
         return f"{self.student.username} - {self.course.code} - {self.grade}"
+
+    @classmethod
+    def grade_for(cls, score):
+        """Letter grade for a score, found by binary search over GRADE_BOUNDARIES."""
+        return cls.GRADES_BY_BAND[bisect_right(cls.GRADE_BOUNDARIES, score)]
+
+    @classmethod
+    def grade_scores(cls, scores):
+        """Letter grades for a whole column of scores in one pass."""
+        boundaries, grades = cls.GRADE_BOUNDARIES, cls.GRADES_BY_BAND
+        return [grades[bisect_right(boundaries, score)] for score in scores]
+
+class StudentCourseHistory(models.Model):
+    """
+    Per-student bitsets over course ids derived from Result: bit n of passed is
+    set when the student has a grade other than F in course n, bit n of failed
+    when they have an F in it. Kept up to date by the Result signal handlers;
+    refresh() recomputes them for bulk changes.
+    """
+    student = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='course_history')
+    passed = models.BinaryField(default=b'')
+    failed = models.BinaryField(default=b'')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Course history of {self.student_id}"
+
+    @staticmethod
+    def pack(bits):
+        return bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+
+    @staticmethod
+    def unpack(data):
+        return int.from_bytes(bytes(data or b''), 'little')
+
+    @property
+    def passed_bits(self):
+        return self.unpack(self.passed)
+
+    @property
+    def failed_bits(self):
+        return self.unpack(self.failed)
+
+    @classmethod
+    def passed_for(cls, student_id):
+        """The student's passed-course bitset, read with a single primary-key lookup."""
+        return cls.unpack(cls.objects.filter(student_id=student_id).values_list('passed', flat=True).first())
+
+    @classmethod
+    def carry_overs_for(cls, student_id):
+        """Bitset of courses the student failed and has not passed since."""
+        passed, failed = cls.objects.filter(student_id=student_id).values_list('passed', 'failed').first() or (b'', b'')
+        return cls.unpack(failed) & ~cls.unpack(passed)
+
+    @classmethod
+    def record_result(cls, student_id, course_id):
+        """Set or clear the student's bits for course_id from their results in that course."""
+        grades = set(Result.objects.filter(student_id=student_id, course_id=course_id).values_list('grade', flat=True))
+        bit = 1 << course_id
+        with transaction.atomic():
+            history, _ = cls.objects.select_for_update().get_or_create(student_id=student_id)
+            passed = history.passed_bits & ~bit
+            failed = history.failed_bits & ~bit
+            if grades - {'F'}:
+                passed |= bit
+            if 'F' in grades:
+                failed |= bit
+            history.passed = cls.pack(passed)
+            history.failed = cls.pack(failed)
+            history.save()
+
+    @classmethod
+    def refresh(cls, student_ids=None):
+        """Recompute the bitsets of student_ids (every student with results when None) from Result."""
+        results = Result.objects.all()
+        if student_ids is None:
+            student_ids = Result.objects.values_list('student_id', flat=True).distinct()
+        else:
+            results = results.filter(student_id__in=student_ids)
+
+        passed = dict.fromkeys(student_ids, 0)
+        failed = dict.fromkeys(passed, 0)
+        for student_id, course_id, grade in results.values_list('student_id', 'course_id', 'grade'):
+            if grade == 'F':
+                failed[student_id] |= 1 << course_id
+            else:
+                passed[student_id] |= 1 << course_id
+
+        cls.objects.bulk_create(
+            [
+                cls(student_id=student_id, passed=cls.pack(passed[student_id]), failed=cls.pack(failed[student_id]))
+                for student_id in passed
+            ],
+            update_conflicts=True,
+            unique_fields=['student'],
+            update_fields=['passed', 'failed', 'updated_at']
+        )
+        return len(passed)
+
+class StudentTranscript(models.Model):
+    """
+    Materialized GPA summary of a student's results: CGPA over all results plus
+    the per-session GPA breakdown, so a transcript read is one row. Kept up to
+    date by the Result signal handlers; refresh() recomputes it.
+    """
+    student = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='transcript')
+    total_units = models.PositiveIntegerField(default=0)
+    quality_points = models.PositiveIntegerField(default=0)
+    cgpa = models.DecimalField(max_digits=3, decimal_places=2, default=Decimal('0.00'))
+    sessions = models.JSONField(default=list, help_text="Per-session units, quality points and GPA, oldest first")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Transcript of {self.student_id} (CGPA {self.cgpa})"
+
+    @staticmethod
+    def gpa(quality_points, units):
+        if not units:
+            return Decimal('0.00')
+        return (Decimal(quality_points) / units).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+    @classmethod
+    def refresh(cls, student_ids=None):
+        """
+        Recompute the transcripts of student_ids (every student with results
+        when None) with one aggregate over Result joined to Course.units.
+        """
+        results = Result.objects.all()
+        if student_ids is None:
+            student_ids = Result.objects.values_list('student_id', flat=True).distinct()
+        else:
+            results = results.filter(student_id__in=student_ids)
+
+        points = models.Case(
+            *[models.When(grade=grade, then=models.Value(value)) for grade, value in Result.GRADE_POINTS.items()],
+            default=models.Value(0)
+        )
+        per_session = (
+            results.values('student_id', 'session_id', 'session__name')
+            .annotate(
+                units=models.Sum('course__units'),
+                quality_points=models.Sum(models.F('course__units') * points)
+            )
+            .order_by('student_id', 'session__start_date', 'session_id')
+        )
+
+        transcripts = {
+            student_id: cls(student_id=student_id, total_units=0, quality_points=0, sessions=[])
+            for student_id in student_ids
+        }
+        for row in per_session:
+            transcript = transcripts[row['student_id']]
+            transcript.total_units += row['units']
+            transcript.quality_points += row['quality_points']
+            transcript.sessions.append({
+                'session_id': row['session_id'],
+                'session': row['session__name'],
+                'units': row['units'],
+                'quality_points': row['quality_points'],
+                'gpa': str(cls.gpa(row['quality_points'], row['units']))
+            })
+        for transcript in transcripts.values():
+            transcript.cgpa = cls.gpa(transcript.quality_points, transcript.total_units)
+
+        cls.objects.bulk_create(
+            transcripts.values(),
+            update_conflicts=True,
+            unique_fields=['student'],
+            update_fields=['total_units', 'quality_points', 'cgpa', 'sessions', 'updated_at']
+        )
+        return len(transcripts)
+
+class OutboundEmail(models.Model):
+    """
+    Transactional email outbox. Rows are written in the same transaction as the
+    change that triggers them and delivered by the dispatch_emails command.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    recipient = models.EmailField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
+
+    @classmethod
+    def build(cls, subject, body, recipient, from_email=None):
+        from django.conf import settings
+        return cls(
+            subject=subject,
+            body=body,
+            recipient=recipient,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL
+        )
+
+    @classmethod
+    def enqueue(cls, subject, body, recipient, from_email=None):
+        email = cls.build(subject, body, recipient, from_email)
+        email.save()
+        return email
@@ -0,0 +1,17 @@
+from courses.pagination import KeysetPagination
+
+
+class RegistrationCursorPagination(KeysetPagination):
+    ordering = ('-submitted_at', '-id')
+
+
+class ResultCursorPagination(KeysetPagination):
+    ordering = ('-id',)
+
+
+class SignatureQueuePagination(KeysetPagination):
+    """Oldest first; always paginated, sized with ?limit=."""
+    ordering = ('submitted_at', 'id')
+    page_size = 20
+    page_size_query_param = 'limit'
+    optional = False
@@ -57,7 +57,8 @@ class RegistrationSerializer(serializers.ModelSerializer):
         read_only_fields = ('submitted_at', 'updated_at', 'total_units', 'status')
 
     def get_signature_appended(self, obj):
-        return obj.signatures.exists()
+        # Uses the prefetched signatures when the queryset was built with a query plan
+        return len(obj.signatures.all()) > 0
 
     def validate(self, attrs):
         # Check if registration window is open
@@ -67,6 +68,35 @@ class RegistrationSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("Registration is not open for this session.")
         return attrs
 
+class RegistrationSummarySerializer(serializers.ModelSerializer):
+    """Compact, read-only registration representation for list pages"""
+    student_name = serializers.SerializerMethodField()
+    matric_number = serializers.CharField(source='student.matric_number', read_only=True)
+    department_code = serializers.CharField(source='department.code', read_only=True)
+    session_name = serializers.CharField(source='session.name', read_only=True)
+    courses = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Registration
+        fields = ('id', 'student_id', 'student_name', 'matric_number', 'department_id',
+                 'department_code', 'session_id', 'session_name', 'level', 'semester',
+                 'status', 'submitted_at', 'total_units', 'courses', 'signature_stage')
+        read_only_fields = fields
+
+    def get_student_name(self, obj):
+        return obj.student.get_full_name() or obj.student.username
+
+    def get_courses(self, obj):
+        return [
+            {
+                'id': reg_course.course_id,
+                'code': reg_course.course.code,
+                'units': reg_course.course.units,
+                'is_carry_over': reg_course.is_carry_over,
+            }
+            for reg_course in obj.courses.all()
+        ]
+
 class ResultSerializer(serializers.ModelSerializer):
     student = UserSerializer(read_only=True)
     student_id = serializers.IntegerField(write_only=True)
@@ -79,6 +109,7 @@ class ResultSerializer(serializers.ModelSerializer):
         model = Result
         fields = ('id', 'student', 'student_id', 'course', 'course_id',
                  'session', 'session_id', 'grade', 'score')
+        read_only_fields = ('grade',)
 
     def validate_score(self, value):
         if not 0 <= value <= 100:
@@ -87,17 +118,6 @@ class ResultSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         # Calculate grade based on score
-        score = attrs['score']
-        if score >= 70:
-            attrs['grade'] = 'A'
-        elif score >= 60:
-            attrs['grade'] = 'B'
-        elif score >= 50:
-            attrs['grade'] = 'C'
-        elif score >= 45:
-            attrs['grade'] = 'D'
-        elif score >= 40:
-            attrs['grade'] = 'E'
-        else:
-            attrs['grade'] = 'F'
-        return attrs 
\ No newline at end of file
+        if 'score' in attrs:
+            attrs['grade'] = Result.grade_for(attrs['score'])
+        return attrs 
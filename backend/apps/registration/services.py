@@ -0,0 +1,394 @@
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from courses.current_session import get_current_session, registration_is_open
+from courses.eligibility import missing_prerequisites
+from courses.models import Course, CourseAllocation, SeatHold, WaitlistEntry
+from users.models import User
+from .models import Registration, RegistrationCourse, Result, StudentCourseHistory, StudentTranscript
+
+MAX_UNITS = 24
+CURRENT_SEMESTER = '2'  # Current semester (Second Semester)
+
+class RegistrationError(Exception):
+    """A submission that cannot be accepted; detail is shown to the student."""
+
+    def __init__(self, detail):
+        super().__init__(detail)
+        self.detail = detail
+
+def submit_registration(student, course_ids, comments=''):
+    """
+    Create or resubmit the student's registration for the current session.
+
+    The (student, session, semester) row is locked, or inserted, inside one short
+    transaction and the courses are attached with a single bulk insert, so
+    concurrent or repeated submissions cannot create duplicates or fail with an
+    IntegrityError. Returns (registration, courses).
+    """
+    course_ids = list(dict.fromkeys(course_ids or []))
+    if not course_ids:
+        raise RegistrationError('No courses selected')
+
+    # Get current academic session
+    session = get_current_session()
+    if not session:
+        raise RegistrationError('No active academic session')
+    if not registration_is_open(session):
+        raise RegistrationError('Registration is not open for this session')
+
+    courses = list(Course.objects.filter(id__in=course_ids).only('id', 'code', 'title', 'units'))
+    if len(courses) != len(course_ids):
+        raise RegistrationError('Some courses not found')
+
+    total_units = sum(course.units for course in courses)
+    if total_units > MAX_UNITS:
+        raise RegistrationError(
+            f'Maximum units ({MAX_UNITS}) exceeded. Selected courses total {total_units} units.'
+        )
+
+    missing = missing_prerequisites(student, course_ids)
+    if missing:
+        raise RegistrationError('Missing prerequisites: ' + '; '.join(
+            f'{course.code} requires {", ".join(missing[course.id])}'
+            for course in courses if course.id in missing
+        ))
+
+    with transaction.atomic():
+        registration = Registration.objects.select_for_update().filter(
+            student=student,
+            session=session,
+            semester=CURRENT_SEMESTER
+        ).first()
+
+        if registration is None:
+            try:
+                with transaction.atomic():
+                    registration = Registration.objects.create(
+                        student=student,
+                        session=session,
+                        department=student.department,
+                        level=student.level or 500,  # Default to 500 for graduate level
+                        semester=CURRENT_SEMESTER,
+                        status='pending',
+                        total_units=total_units,
+                        comments=comments
+                    )
+            except IntegrityError:
+                # A concurrent submission for the same student won the insert
+                raise RegistrationError('You already have a pending registration. Please wait for approval.')
+        else:
+            # Only registrations with courses (total_units > 0) block a new submission
+            if registration.total_units > 0 and registration.status == 'approved':
+                raise RegistrationError('You already have an approved registration for this session')
+            if registration.total_units > 0 and registration.status == 'pending':
+                raise RegistrationError('You already have a pending registration. Please wait for approval.')
+
+            # Empty or rejected registration: reuse the row for the new submission
+            release_registration_seats([registration])
+            RegistrationCourse.objects.filter(registration=registration).delete()
+            registration.department = student.department
+            registration.level = student.level or 500
+            registration.status = 'pending'
+            registration.total_units = total_units
+            registration.comments = comments
+            registration.submitted_at = timezone.now()
+            registration.save()
+
+        claim_registration_seats(student, session, courses)
+        release_unsubmitted_holds(student, session)
+        carry_overs = StudentCourseHistory.carry_overs_for(student.pk)
+        RegistrationCourse.objects.bulk_create([
+            RegistrationCourse(registration=registration, course=course, is_carry_over=bool(carry_overs >> course.id & 1))
+            for course in courses
+        ])
+
+    return registration, courses
+
+def add_held_course(student, course):
+    """
+    Add a course whose seat is held for the student, typically one handed over
+    from the waitlist, to their pending registration for the current session.
+
+    The hold is converted into the student's seat and the RegistrationCourse
+    row is added in one transaction, so the seat is never released in between.
+    Returns the registration; raises RegistrationError when there is no
+    pending registration or no live hold, or the course cannot be added.
+    """
+    session = get_current_session()
+    if not session:
+        raise RegistrationError('No active academic session')
+    if not registration_is_open(session):
+        raise RegistrationError('Registration is not open for this session')
+
+    missing = missing_prerequisites(student, [course.id]).get(course.id)
+    if missing:
+        raise RegistrationError(f'Missing prerequisites: {course.code} requires {", ".join(missing)}')
+
+    Enrollment = CourseAllocation.registered_students.through
+    with transaction.atomic():
+        registration = Registration.objects.select_for_update().filter(
+            student=student,
+            session=session,
+            semester=CURRENT_SEMESTER,
+            status='pending'
+        ).first()
+        if registration is None:
+            raise RegistrationError('No pending registration; submit a registration that includes the course instead')
+
+        hold = SeatHold.objects.select_for_update().filter(
+            allocation__course=course,
+            allocation__session=session,
+            student=student,
+            expires_at__gt=timezone.now()
+        ).first()
+        if hold is None:
+            raise RegistrationError(f'No seat is held for you in {course.code}')
+
+        if RegistrationCourse.objects.filter(registration=registration, course=course).exists():
+            raise RegistrationError(f'{course.code} is already in your registration')
+        if registration.total_units + course.units > MAX_UNITS:
+            raise RegistrationError(
+                f'Maximum units ({MAX_UNITS}) exceeded. Adding {course.code} makes '
+                f'{registration.total_units + course.units} units.'
+            )
+
+        # The hold already counts the seat, so it becomes the enrollment as it is
+        hold.delete()
+        _, created = Enrollment.objects.get_or_create(courseallocation_id=hold.allocation_id, user_id=student.pk)
+        if not created:
+            # Already enrolled, so the hold was counting a second seat
+            CourseAllocation.release_seats(hold.allocation_id)
+        WaitlistEntry.objects.filter(allocation_id=hold.allocation_id, student_id=student.pk).delete()
+        carry_overs = StudentCourseHistory.carry_overs_for(student.pk)
+        RegistrationCourse.objects.create(
+            registration=registration,
+            course=course,
+            is_carry_over=bool(carry_overs >> course.id & 1)
+        )
+        registration.total_units += course.units
+        registration.save(update_fields=['total_units', 'updated_at'])
+
+    return registration
+
+def claim_registration_seats(student, session, courses):
+    """
+    Take a seat for the student in the session's allocation of each course.
+
+    Each seat is claimed with a conditional UPDATE, so an allocation can never go
+    over capacity, unless the student's seat hold already covers it; raises
+    RegistrationError when one is full. Must run inside the
+    caller's transaction so that a failure rolls back the seats already claimed.
+    Courses without an allocation are not capacity-limited.
+    """
+    Enrollment = CourseAllocation.registered_students.through
+    allocations = dict(
+        CourseAllocation.objects.filter(session=session, course__in=courses).values_list('id', 'course__code')
+    )
+    if not allocations:
+        return
+
+    enrolled = set(
+        Enrollment.objects.filter(user_id=student.pk, courseallocation_id__in=allocations)
+        .values_list('courseallocation_id', flat=True)
+    )
+    # Seats held in the student's cart are already counted and convert as they are
+    held = set(
+        SeatHold.objects.select_for_update().filter(student_id=student.pk, allocation_id__in=allocations)
+        .values_list('allocation_id', flat=True)
+    )
+    new_allocations = [allocation_id for allocation_id in allocations if allocation_id not in enrolled]
+    for allocation_id in new_allocations:
+        if allocation_id in held:
+            continue
+        if not CourseAllocation.claim_seat(allocation_id):
+            SeatHold.release_expired(allocation_id=allocation_id)
+            if not CourseAllocation.claim_seat(allocation_id):
+                raise RegistrationError(f'Course is full: {allocations[allocation_id]}')
+
+    Enrollment.objects.bulk_create([
+        Enrollment(courseallocation_id=allocation_id, user_id=student.pk)
+        for allocation_id in new_allocations
+    ])
+    WaitlistEntry.objects.filter(student_id=student.pk, allocation_id__in=allocations).delete()
+    if held:
+        SeatHold.objects.filter(student_id=student.pk, allocation_id__in=held).delete()
+        # A hold on a course the student was already enrolled in counted a second seat
+        for allocation_id in held & enrolled:
+            CourseAllocation.release_seats(allocation_id)
+
+def release_unsubmitted_holds(student, session):
+    """
+    Give back the seats the student still holds in the session after a
+    submission, i.e. for courses left out of it (the submitted ones were
+    converted by claim_registration_seats). Run in the submission's transaction.
+    """
+    holds = list(
+        SeatHold.objects.select_for_update()
+        .filter(student_id=student.pk, allocation__session=session)
+        .values_list('pk', 'allocation_id')
+    )
+    if not holds:
+        return
+    SeatHold.objects.filter(pk__in=[pk for pk, _ in holds]).delete()
+    for allocation_id, count in Counter(allocation_id for _, allocation_id in holds).items():
+        CourseAllocation.release_seats(allocation_id, count)
+
+def release_registration_seats(registrations, course_ids=None):
+    """
+    Free the allocation seats held by the given registrations, optionally only
+    for course_ids. Call before the RegistrationCourse rows are deleted.
+    """
+    registration_courses = RegistrationCourse.objects.filter(registration__in=registrations)
+    if course_ids is not None:
+        registration_courses = registration_courses.filter(course_id__in=course_ids)
+    held = set(registration_courses.values_list(
+        'registration__student_id', 'registration__session_id', 'course_id'
+    ))
+    if not held:
+        return
+
+    Enrollment = CourseAllocation.registered_students.through
+    enrollments = Enrollment.objects.filter(
+        user_id__in={student_id for student_id, _, _ in held},
+        courseallocation__session_id__in={session_id for _, session_id, _ in held},
+        courseallocation__course_id__in={course_id for _, _, course_id in held}
+    ).values_list('pk', 'user_id', 'courseallocation_id', 'courseallocation__session_id', 'courseallocation__course_id')
+
+    released = []
+    released_per_allocation = Counter()
+    for pk, student_id, allocation_id, session_id, course_id in enrollments:
+        if (student_id, session_id, course_id) in held:
+            released.append(pk)
+            released_per_allocation[allocation_id] += 1
+
+    Enrollment.objects.filter(pk__in=released).delete()
+    for allocation_id, count in released_per_allocation.items():
+        CourseAllocation.release_seats(allocation_id, count)
+
+def mark_carry_overs(session):
+    """
+    Flag, in one set-based pass, the session's registered courses that the
+    student failed in an earlier session and has not passed since; clears the
+    flag where that no longer holds. Returns (marked, cleared).
+    """
+    results = Result.objects.filter(
+        student_id=OuterRef('registration__student_id'),
+        course_id=OuterRef('course_id')
+    ).exclude(session_id=OuterRef('registration__session_id'))
+    registration_courses = RegistrationCourse.objects.filter(registration__session=session)
+    outstanding = Exists(results.filter(grade='F')) & ~Exists(results.exclude(grade='F'))
+
+    with transaction.atomic():
+        marked = registration_courses.filter(outstanding, is_carry_over=False).update(is_carry_over=True)
+        cleared = registration_courses.filter(~outstanding, is_carry_over=True).update(is_carry_over=False)
+    return marked, cleared
+
+def outstanding_carry_overs(student):
+    """The student's failed results in courses they have not passed since, in one query."""
+    passed = Result.objects.filter(
+        student_id=OuterRef('student_id'),
+        course_id=OuterRef('course_id')
+    ).exclude(grade='F')
+    return (
+        Result.objects.filter(student=student, grade='F')
+        .exclude(Exists(passed))
+        .order_by('course__code', 'session__name')
+        .values('course_id', 'course__code', 'course__title', 'course__units', 'session_id', 'session__name', 'score')
+    )
+
+def upload_results(course, session, rows):
+    """
+    Validate a class result sheet for one course and session and upsert it.
+
+    rows is a sequence of (row_number, data) where data holds student_id or
+    matric_number and score. Invalid rows are reported and skipped; the rest
+    are graded in one pass over the score column and written with a single
+    upsert on (student, course, session). Returns (created, updated, errors).
+    """
+    errors = []
+    student_ids = set()
+    matric_numbers = set()
+    for _, data in rows:
+        if data.get('student_id') not in (None, ''):
+            try:
+                student_ids.add(int(data['student_id']))
+            except (TypeError, ValueError):
+                pass
+        elif data.get('matric_number'):
+            matric_numbers.add(str(data['matric_number']).strip())
+
+    students = User.objects.filter(user_type='student').filter(
+        Q(pk__in=student_ids) | Q(matric_number__in=matric_numbers)
+    ).values_list('pk', 'matric_number')
+    known_ids = set()
+    ids_by_matric = {}
+    for pk, matric_number in students:
+        known_ids.add(pk)
+        if matric_number:
+            ids_by_matric[matric_number] = pk
+
+    valid = []
+    seen = set()
+    for row_number, data in rows:
+        if data.get('student_id') not in (None, ''):
+            try:
+                student_id = int(data['student_id'])
+            except (TypeError, ValueError):
+                errors.append({'row': row_number, 'detail': 'student_id must be an integer'})
+                continue
+            if student_id not in known_ids:
+                errors.append({'row': row_number, 'detail': f'Student {student_id} not found'})
+                continue
+        elif data.get('matric_number'):
+            student_id = ids_by_matric.get(str(data['matric_number']).strip())
+            if student_id is None:
+                errors.append({'row': row_number, 'detail': f'Matric number {data["matric_number"]} not found'})
+                continue
+        else:
+            errors.append({'row': row_number, 'detail': 'student_id or matric_number is required'})
+            continue
+
+        try:
+            score = Decimal(str(data.get('score')).strip())
+        except InvalidOperation:
+            score = None
+        if score is None or not score.is_finite():
+            errors.append({'row': row_number, 'detail': 'score must be a number'})
+            continue
+        if not 0 <= score <= 100:
+            errors.append({'row': row_number, 'detail': 'Score must be between 0 and 100.'})
+            continue
+
+        if student_id in seen:
+            errors.append({'row': row_number, 'detail': 'Duplicate row for this student'})
+            continue
+        seen.add(student_id)
+        valid.append((student_id, score.quantize(Decimal('0.01'))))
+
+    if not valid:
+        return 0, 0, errors
+
+    grades = Result.grade_scores([score for _, score in valid])
+    existing = set(
+        Result.objects.filter(course=course, session=session, student_id__in=seen)
+        .values_list('student_id', flat=True)
+    )
+    with transaction.atomic():
+        Result.objects.bulk_create(
+            [
+                Result(student_id=student_id, course=course, session=session, score=score, grade=grade)
+                for (student_id, score), grade in zip(valid, grades)
+            ],
+            update_conflicts=True,
+            unique_fields=['student', 'course', 'session'],
+            update_fields=['score', 'grade']
+        )
+        # bulk_create bypasses the Result signals, so refresh the derived records here
+        StudentCourseHistory.refresh(seen)
+        StudentTranscript.refresh(seen)
+
+    return len(seen - existing), len(seen & existing), errors
@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from users.models import User
+from .models import Result, StudentCourseHistory, StudentTranscript
+
+def refresh_student_records(keys, check_students=False):
+    """
+    Once the change commits, bring the course bitsets and transcripts of the
+    (student_id, course_id) pairs in keys up to date.
+    """
+    def refresh():
+        student_ids = {student_id for student_id, _ in keys}
+        if check_students:
+            # Results also go when their student is deleted; nothing to refresh then
+            student_ids = set(User.objects.filter(pk__in=student_ids).values_list('pk', flat=True))
+        for student_id, course_id in keys:
+            if student_id in student_ids:
+                StudentCourseHistory.record_result(student_id, course_id)
+        if student_ids:
+            StudentTranscript.refresh(student_ids)
+    transaction.on_commit(refresh)
+
+@receiver(pre_save, sender=Result)
+def remember_previous_course(sender, instance, **kwargs):
+    """Note the student and course a result is moved away from, if any."""
+    instance._previous_key = None
+    if instance.pk:
+        previous = Result.objects.filter(pk=instance.pk).values_list('student_id', 'course_id').first()
+        if previous and previous != (instance.student_id, instance.course_id):
+            instance._previous_key = previous
+
+@receiver(post_save, sender=Result)
+def result_saved(sender, instance, **kwargs):
+    keys = {(instance.student_id, instance.course_id)}
+    if getattr(instance, '_previous_key', None):
+        keys.add(instance._previous_key)
+    refresh_student_records(keys)
+
+@receiver(post_delete, sender=Result)
+def result_deleted(sender, instance, **kwargs):
+    refresh_student_records({(instance.student_id, instance.course_id)}, check_students=True)
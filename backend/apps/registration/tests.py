@@ -1,3 +1,206 @@
-from django.test import TestCase
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from rest_framework.test import APIClient
+from courses.models import AcademicSession, Course, CourseAllocation, Department
+from users.models import User
+from .models import Registration, RegistrationCourse
+from .services import RegistrationError, submit_registration
 
 # Create your tests here.
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentSubmissionTests(TransactionTestCase):
+    """
+    submit_registration must hold up under many parallel submissions. Needs a
+    row-locking database; see backend/settings/test.py for running on PostgreSQL.
+    """
+
+    students_count = 40
+    submissions_per_student = 5
+
+    def setUp(self):
+        department = Department.objects.create(name='Computer Science', code='CSC')
+        self.session = AcademicSession.objects.create(
+            name='2024/2025',
+            registration_start_date=datetime.date(2024, 1, 1),
+            registration_end_date=datetime.date(2030, 12, 31),
+            is_current=True
+        )
+        self.courses = [
+            Course.objects.create(code=f'CSC50{i}', title=f'Course {i}', units=3, department=department)
+            for i in range(4)
+        ]
+        self.students = [
+            User.objects.create_user(
+                username=f'student{i}', email=f'student{i}@example.com', password='password',
+                user_type='student', department=department, level=500
+            )
+            for i in range(self.students_count)
+        ]
+
+    def submit(self, student):
+        try:
+            submit_registration(student, [course.id for course in self.courses])
+            return 'created'
+        except RegistrationError:
+            return 'rejected'
+        finally:
+            connection.close()
+
+    def test_parallel_submissions(self):
+        # 200 submissions: every student submits several times at once
+        submissions = [student for student in self.students for _ in range(self.submissions_per_student)]
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            outcomes = list(pool.map(self.submit, submissions))
+
+        self.assertEqual(outcomes.count('created'), self.students_count)
+        self.assertEqual(outcomes.count('rejected'), len(submissions) - self.students_count)
+        self.assertEqual(Registration.objects.count(), self.students_count)
+        self.assertEqual(RegistrationCourse.objects.count(), self.students_count * len(self.courses))
+        for registration in Registration.objects.all():
+            self.assertEqual(registration.total_units, 12)
+            self.assertEqual(registration.status, 'pending')
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentSeatClaimTests(TransactionTestCase):
+    """
+    Parallel submissions must never take more seats than a course allocation
+    has. Needs a row-locking database, like ConcurrentSubmissionTests.
+    """
+
+    students_count = 40
+    capacity = 5
+
+    def setUp(self):
+        department = Department.objects.create(name='Computer Science', code='CSC')
+        session = AcademicSession.objects.create(
+            name='2024/2025',
+            registration_start_date=datetime.date(2024, 1, 1),
+            registration_end_date=datetime.date(2030, 12, 31),
+            is_current=True
+        )
+        self.course = Course.objects.create(code='CSC501', title='Course', units=3, department=department)
+        self.allocation = CourseAllocation.objects.create(course=self.course, session=session, capacity=self.capacity)
+        self.students = [
+            User.objects.create_user(
+                username=f'student{i}', email=f'student{i}@example.com', password='password',
+                user_type='student', department=department, level=500
+            )
+            for i in range(self.students_count)
+        ]
+
+    def submit(self, student):
+        try:
+            submit_registration(student, [self.course.id])
+            return 'created'
+        except RegistrationError:
+            return 'full'
+        finally:
+            connection.close()
+
+    def test_parallel_submissions_for_a_small_course(self):
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            outcomes = list(pool.map(self.submit, self.students))
+
+        self.allocation.refresh_from_db()
+        self.assertLessEqual(self.allocation.seats_taken, self.allocation.capacity)
+        self.assertEqual(outcomes.count('created'), self.capacity)
+        self.assertEqual(self.allocation.seats_taken, self.capacity)
+        self.assertEqual(self.allocation.registered_students.count(), self.capacity)
+        self.assertEqual(RegistrationCourse.objects.count(), self.capacity)
+
+class BulkRegistrationIdsTests(TestCase):
+    """The bulk endpoints accept registration_ids only as a list of integers."""
+
+    invalid_ids = ['12', {'id': 12}, [True], [1.5], ['x'], [None]]
+
+    def setUp(self):
+        department = Department.objects.create(name='Computer Science', code='CSC')
+        session = AcademicSession.objects.create(
+            name='2024/2025',
+            registration_start_date=datetime.date(2024, 1, 1),
+            registration_end_date=datetime.date(2030, 12, 31),
+            is_current=True
+        )
+        student = User.objects.create_user(
+            username='student', email='student@example.com', password='password',
+            user_type='student', department=department, level=500
+        )
+        self.registration = Registration.objects.create(
+            student=student, session=session, department=department, semester='1', level=500, status='approved'
+        )
+        self.officer = User.objects.create_user(
+            username='officer', email='officer@example.com', password='password',
+            user_type='registration_officer', department=department
+        )
+        self.officer.signature = 'signatures/officer.png'
+        self.officer.save()
+        self.client = APIClient()
+        self.client.force_authenticate(self.officer)
+
+    def test_bulk_approve_rejects_malformed_ids(self):
+        for registration_ids in self.invalid_ids:
+            with self.subTest(registration_ids=registration_ids):
+                response = self.client.post(
+                    '/api/courses/registrations/bulk_approve/',
+                    {'action': 'reject', 'registration_ids': registration_ids}, format='json'
+                )
+                self.assertEqual(response.status_code, 400)
+        self.registration.refresh_from_db()
+        self.assertEqual(self.registration.status, 'approved')
+
+    def test_bulk_append_signature_rejects_malformed_ids(self):
+        for registration_ids in self.invalid_ids:
+            with self.subTest(registration_ids=registration_ids):
+                response = self.client.post(
+                    '/api/registrations/append-signature/bulk/',
+                    {'registration_ids': registration_ids}, format='json'
+                )
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.registration.signatures.exists())
+
+    def test_bulk_append_signature_accepts_numeric_strings(self):
+        response = self.client.post(
+            '/api/registrations/append-signature/bulk/',
+            {'registration_ids': [str(self.registration.pk)]}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.registration.signatures.count(), 1)
+
+class PrintRegistrationFormTests(TestCase):
+    """Ownership is checked before a conditional request can get 304."""
+
+    def setUp(self):
+        department = Department.objects.create(name='Computer Science', code='CSC')
+        session = AcademicSession.objects.create(
+            name='2024/2025',
+            registration_start_date=datetime.date(2024, 1, 1),
+            registration_end_date=datetime.date(2030, 12, 31),
+            is_current=True
+        )
+        self.owner, self.other = [
+            User.objects.create_user(
+                username=f'student{i}', email=f'student{i}@example.com', password='password',
+                user_type='student', department=department, level=500
+            )
+            for i in range(2)
+        ]
+        registration = Registration.objects.create(
+            student=self.owner, session=session, department=department, semester='1', level=500
+        )
+        self.url = f'/api/print/{registration.pk}/'
+
+    def test_other_student_gets_403_with_a_matching_etag(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        client.force_authenticate(self.other)
+        self.assertEqual(client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 403)
+        self.assertEqual(client.get('/api/print/0/').status_code, 404)
@@ -5,13 +5,21 @@ app_name = 'registration'
 
 urlpatterns = [
     path('registrations/', views.RegistrationListView.as_view(), name='registration-list'),
+    path('registrations/signature-queue/', views.SignatureQueueView.as_view(), name='signature-queue'),
     path('registrations/<int:pk>/', views.RegistrationDetailView.as_view(), name='registration-detail'),
     path('registrations/<int:pk>/append-signature/', views.AppendSignatureView.as_view(), name='append-signature'),
+    path('registrations/append-signature/bulk/', views.BulkAppendSignatureView.as_view(), name='bulk-append-signature'),
     path('registration-courses/', views.RegistrationCourseListView.as_view(), name='registration-course-list'),
     path('registration-courses/<int:pk>/', views.RegistrationCourseDetailView.as_view(), name='registration-course-detail'),
     path('registration-approvals/', views.RegistrationApprovalListView.as_view(), name='registration-approval-list'),
     path('registration-approvals/<int:pk>/', views.RegistrationApprovalDetailView.as_view(), name='registration-approval-detail'),
     path('results/', views.ResultListView.as_view(), name='result-list'),
+    path('results/bulk/', views.BulkResultUploadView.as_view(), name='bulk-result-upload'),
+    path('results/carry-overs/', views.CarryOverListView.as_view(), name='carry-over-list'),
+    path('results/transcript/', views.TranscriptView.as_view(), name='transcript'),
     path('results/<int:pk>/', views.ResultDetailView.as_view(), name='result-detail'),
+    path('exports/registrations/', views.RegistrationExportView.as_view(), name='registration-export'),
+    path('exports/rosters/', views.RosterExportView.as_view(), name='roster-export'),
+    path('exports/results/', views.ResultExportView.as_view(), name='result-export'),
     path('print/<int:pk>/', views.PrintRegistrationFormView.as_view(), name='print-registration-form'),
 ] 
\ No newline at end of file
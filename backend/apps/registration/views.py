@@ -1,16 +1,30 @@
 from django.shortcuts import render
 from rest_framework import generics, permissions, status, filters
 from rest_framework.response import Response
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
-from django.core.mail import send_mail
-from django.conf import settings
+from django.http import Http404
+from django.db import models, transaction
 from django.urls import reverse
-import os
-from .models import Registration, RegistrationCourse, RegistrationApproval, RegistrationSignature, Result
+from django.utils import timezone
+import csv
+import io
+from users.models import User
+from courses.conditional import conditional_get, make_etag
+from courses.models import AcademicSession, CatalogVersion, Course
+from .models import (
+    Registration, RegistrationCourse, RegistrationApproval, RegistrationSignature, Result,
+    OutboundEmail, StudentTranscript, SIGNATURE_ORDER, get_signature_stage
+)
+from .exports import EXPORT_CHUNK_SIZE, stream_csv
+from .pagination import RegistrationCursorPagination, ResultCursorPagination, SignatureQueuePagination
+from .services import outstanding_carry_overs, release_registration_seats, upload_results
 from .serializers import (
     RegistrationSerializer,
+    RegistrationSummarySerializer,
     RegistrationCourseSerializer,
     RegistrationApprovalSerializer,
     ResultSerializer
@@ -18,19 +32,42 @@ from .serializers import (
 
 # Create your views here.
 
-class RegistrationListView(generics.ListCreateAPIView):
+class RegistrationListMixin:
+    """
+    Query plan shared by the registration list endpoints.
+
+    Pass ?view=summary to get RegistrationSummarySerializer rows instead of the
+    full nested form; either way the related objects are loaded up front.
+    """
+    summary_serializer_class = RegistrationSummarySerializer
+
+    def is_summary_view(self):
+        return self.request.method == 'GET' and self.request.query_params.get('view') == 'summary'
+
+    def get_serializer_class(self):
+        if self.is_summary_view():
+            return self.summary_serializer_class
+        return super().get_serializer_class()
+
+    def with_query_plan(self, queryset):
+        if self.is_summary_view():
+            return queryset.with_summary_plan()
+        return queryset.with_serializer_plan(self.request.user)
+
+class RegistrationListView(RegistrationListMixin, generics.ListCreateAPIView):
     serializer_class = RegistrationSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = RegistrationCursorPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'session', 'department', 'level', 'semester']
 
     def get_queryset(self):
         user = self.request.user
         if user.user_type == 'student':
-            return Registration.objects.filter(student=user)
+            return self.with_query_plan(Registration.objects.filter(student=user))
         elif user.user_type in ['registration_officer', 'hod', 'school_officer'] or user.is_staff:
             # Admin users (registration officers, HODs, school officers, staff) can see all registrations
-            return Registration.objects.all().order_by('-submitted_at')
+            return self.with_query_plan(Registration.objects.all().order_by('-submitted_at'))
         return Registration.objects.none()
 
 class RegistrationDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -40,8 +77,102 @@ class RegistrationDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.user_type == 'student':
-            return Registration.objects.filter(student=user)
-        return Registration.objects.all()
+            return Registration.objects.filter(student=user).with_serializer_plan(user)
+        return Registration.objects.with_serializer_plan(user)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            release_registration_seats([instance])
+            instance.delete()
+
+def parse_id_list(value):
+    """The unique ids in a JSON list of integers, or None when value is not such a list."""
+    if not isinstance(value, list):
+        return None
+    ids = []
+    for pk in value:
+        if isinstance(pk, bool) or not isinstance(pk, (int, str)) or not str(pk).isdigit():
+            return None
+        ids.append(int(pk))
+    return list(dict.fromkeys(ids))
+
+class SignatureQueueView(generics.ListAPIView):
+    """
+    Oldest approved registrations whose next required signature is the caller's.
+
+    Registration officers and HODs see their own department; the school officer
+    signs for every department and may narrow the queue with ?department=.
+    """
+    serializer_class = RegistrationSummarySerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = SignatureQueuePagination
+    department_scoped_roles = ('registration_officer', 'hod')
+
+    def get_queryset(self):
+        user = self.request.user
+        stage = SIGNATURE_ORDER.index(user.user_type)
+        queryset = Registration.objects.filter(status='approved', signature_stage=stage)
+
+        if user.user_type in self.department_scoped_roles:
+            queryset = queryset.filter(department_id=user.department_id)
+        elif self.request.query_params.get('department'):
+            queryset = queryset.filter(department_id=int(self.request.query_params['department']))
+        return queryset.with_summary_plan()
+
+    def list(self, request, *args, **kwargs):
+        if request.user.user_type not in SIGNATURE_ORDER:
+            return Response(
+                {'detail': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        if not (request.query_params.get('department') or '0').isdigit():
+            return Response(
+                {'detail': 'department must be a department id'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return super().list(request, *args, **kwargs)
+
+def get_signature_order_error(user_type, signer_roles):
+    """
+    Explain why user_type may not sign next, given the roles that have already
+    signed, or return None when the signature order allows it.
+    """
+    current_position = SIGNATURE_ORDER.index(user_type)
+
+    # If this is not the first signature (registration_officer), the previous role must have signed
+    if current_position > 0:
+        previous_role = SIGNATURE_ORDER[current_position - 1]
+        if previous_role not in signer_roles:
+            return f'The {previous_role.replace("_", " ").title()} must sign before you'
+
+    # No one after this role may have signed yet
+    if signer_roles & set(SIGNATURE_ORDER[current_position + 1:]):
+        return 'Cannot insert signature before later signatories who have already signed'
+    return None
+
+def get_signature_identity(user):
+    """Name and title to display with a user's signature"""
+    signature_name = f"{user.first_name} {user.last_name}".strip() if user.first_name or user.last_name else user.username
+
+    if user.user_type == 'registration_officer':
+        signature_title = 'Registration Officer'
+    elif user.user_type == 'hod':
+        signature_title = 'Head of Department'
+    elif user.user_type == 'school_officer':
+        signature_title = 'School Officer'
+    else:
+        signature_title = 'Administrator'
+    return signature_name, signature_title
+
+def get_form_signed_email(student_name):
+    """Subject and body of the email sent once a form is fully signed"""
+    subject = 'Course Registration Form'
+    message = f"""Dear {student_name},
+
+We are pleased to inform you that your course form has been approved for the semester and fully signed by all the required officials
+
+Go to your dashbboard and print out your course form for submission"""
+    return subject, message
 
 class AppendSignatureView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -64,7 +195,7 @@ class AppendSignatureView(APIView):
             )
         
         # Get registration
-        registration = get_object_or_404(Registration, pk=pk)
+        registration = get_object_or_404(Registration.objects.select_related('student'), pk=pk)
         
         # Check if registration is approved
         if registration.status != 'approved':
@@ -73,105 +204,52 @@ class AppendSignatureView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Get existing signatures for this registration
+        existing_signatures = list(
+            RegistrationSignature.objects.filter(registration=registration)
+            .values_list('signed_by_id', 'signed_by__user_type')
+        )
+
         # Check if user already signed this registration
-        existing_signature = RegistrationSignature.objects.filter(
-            registration=registration,
-            signed_by=user
-        ).first()
-        
-        if existing_signature:
+        if any(signed_by_id == user.id for signed_by_id, _ in existing_signatures):
             return Response(
                 {'detail': 'You have already signed this registration'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Get existing signatures for this registration
-        existing_signatures = RegistrationSignature.objects.filter(registration=registration)
-        
-        # Define the required signature order
-        signature_order = ['registration_officer', 'hod', 'school_officer']
-        
-        # Get current user's position in the order
-        try:
-            current_position = signature_order.index(user.user_type)
-        except ValueError:
+        if user.user_type not in SIGNATURE_ORDER:
             return Response(
                 {'detail': 'Invalid user type for signature order'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-            
-        # If this is not the first signature (registration_officer)
-        if current_position > 0:
-            # Check if the previous role has signed
-            previous_role = signature_order[current_position - 1]
-            previous_signature = existing_signatures.filter(
-                signed_by__user_type=previous_role
-            ).first()
-            
-            if not previous_signature:
-                return Response(
-                    {'detail': f'The {previous_role.replace("_", " ").title()} must sign before you'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        
-        # If this is not the last signature, check no one after has signed yet
-        if current_position < len(signature_order) - 1:
-            next_signatures = existing_signatures.filter(
-                signed_by__user_type__in=signature_order[current_position + 1:]
+
+        order_error = get_signature_order_error(
+            user.user_type,
+            {user_type for _, user_type in existing_signatures}
+        )
+        if order_error:
+            return Response(
+                {'detail': order_error},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            
-            if next_signatures.exists():
-                return Response(
-                    {'detail': 'Cannot insert signature before later signatories who have already signed'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
         
         # Determine signature name and title
-        signature_name = f"{user.first_name} {user.last_name}".strip() if user.first_name or user.last_name else user.username
-        
-        if user.user_type == 'registration_officer':
-            signature_title = 'Registration Officer'
-        elif user.user_type == 'hod':
-            signature_title = 'Head of Department'
-        elif user.user_type == 'school_officer':
-            signature_title = 'School Officer'
-        else:
-            signature_title = 'Administrator'
+        signature_name, signature_title = get_signature_identity(user)
         
-        # Create signature record
-        signature = RegistrationSignature.objects.create(
-            registration=registration,
-            signed_by=user,
-            signature_name=signature_name,
-            signature_title=signature_title
-        )
+        with transaction.atomic():
+            # Create signature record
+            signature = RegistrationSignature.objects.create(
+                registration=registration,
+                signed_by=user,
+                signature_name=signature_name,
+                signature_title=signature_title
+            )
 
-        # If this is the school officer (last signature), send email to student
-        if user.user_type == 'school_officer':
+            # If this is the school officer (last signature), queue an email to the student
             student = registration.student
-            if student.email:
-                # Get the frontend URL from environment variable or use a default
-                frontend_url = os.getenv('FRONTEND_URL', 'http://localhost:3000')
-                form_url = f"{frontend_url}/registration/print/{registration.id}"
-                
-                subject = 'Course Registration Form'
-                message = f"""Dear {student.first_name or student.username},
-
-We are pleased to inform you that your course form has been approved for the semester and fully signed by all the required officials
-
-Go to your dashbboard and print out your course form for submission"""
-
-                try:
-                    send_mail(
-                        subject=subject,
-                        message=message,
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[student.email],
-                        fail_silently=True
-                    )
-                except Exception as e:
-                    # Log the error but don't prevent the signature from being saved
-                    print(f"Failed to send email to student: {e}")
+            if user.user_type == 'school_officer' and student.email:
+                subject, message = get_form_signed_email(student.first_name or student.username)
+                OutboundEmail.enqueue(subject, message, student.email)
         
         return Response({
             'detail': 'Signature appended successfully',
@@ -180,6 +258,106 @@ Go to your dashbboard and print out your course form for submission"""
             'signature_title': signature_title
         }, status=status.HTTP_201_CREATED)
 
+class BulkAppendSignatureView(APIView):
+    """Append the caller's signature to many approved registrations at once"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        user = request.user
+
+        if user.user_type not in SIGNATURE_ORDER:
+            return Response(
+                {'detail': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        if not user.signature:
+            return Response(
+                {'detail': 'Please upload your signature first'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        registration_ids = parse_id_list(request.data.get('registration_ids', []))
+        if registration_ids is None:
+            return Response(
+                {'detail': 'registration_ids must be a list of integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not registration_ids:
+            return Response(
+                {'detail': 'No registrations selected'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        signature_name, signature_title = get_signature_identity(user)
+        signed, skipped = [], []
+
+        with transaction.atomic():
+            registrations = {
+                row[0]: row[1:] for row in Registration.objects.select_for_update(of=('self',))
+                .filter(id__in=registration_ids)
+                .values_list('id', 'status', 'student__email', 'student__first_name', 'student__username')
+            }
+
+            signer_ids, signer_roles = {}, {}
+            for registration_id, signed_by_id, user_type in RegistrationSignature.objects.filter(
+                registration_id__in=registrations
+            ).values_list('registration_id', 'signed_by_id', 'signed_by__user_type'):
+                signer_ids.setdefault(registration_id, set()).add(signed_by_id)
+                signer_roles.setdefault(registration_id, set()).add(user_type)
+
+            for registration_id in registration_ids:
+                if registration_id not in registrations:
+                    reason = 'Registration not found'
+                elif registrations[registration_id][0] != 'approved':
+                    reason = 'Registration must be approved before signature can be appended'
+                elif user.id in signer_ids.get(registration_id, ()):
+                    reason = 'You have already signed this registration'
+                else:
+                    reason = get_signature_order_error(user.user_type, signer_roles.get(registration_id, set()))
+
+                if reason:
+                    skipped.append({'registration_id': registration_id, 'reason': reason})
+                else:
+                    signed.append(registration_id)
+
+            RegistrationSignature.objects.bulk_create([
+                RegistrationSignature(
+                    registration_id=registration_id,
+                    signed_by=user,
+                    signature_name=signature_name,
+                    signature_title=signature_title
+                )
+                for registration_id in signed
+            ])
+
+            # bulk_create skips RegistrationSignature.save(), so move signature_stage forward here
+            by_stage = {}
+            for registration_id in signed:
+                stage = get_signature_stage(signer_roles.get(registration_id, set()) | {user.user_type})
+                by_stage.setdefault(stage, []).append(registration_id)
+            now = timezone.now()
+            for stage, ids in by_stage.items():
+                Registration.objects.filter(id__in=ids).update(signature_stage=stage, updated_at=now)
+
+            # If this is the school officer (last signature), queue an email to every student
+            if user.user_type == 'school_officer':
+                emails = []
+                for registration_id in signed:
+                    email, first_name, username = registrations[registration_id][1:]
+                    if email:
+                        subject, message = get_form_signed_email(first_name or username)
+                        emails.append(OutboundEmail.build(subject, message, email))
+                OutboundEmail.objects.bulk_create(emails)
+
+        return Response({
+            'detail': f'Signature appended to {len(signed)} registration(s)',
+            'signed': signed,
+            'skipped': skipped,
+            'signature_name': signature_name,
+            'signature_title': signature_title
+        }, status=status.HTTP_201_CREATED if signed else status.HTTP_200_OK)
+
 class RegistrationCourseListView(generics.ListCreateAPIView):
     serializer_class = RegistrationCourseSerializer
     permission_classes = (permissions.IsAuthenticated,)
@@ -231,14 +409,135 @@ class RegistrationApprovalDetailView(generics.RetrieveUpdateDestroyAPIView):
 class ResultListView(generics.ListCreateAPIView):
     serializer_class = ResultSerializer
     permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = ResultCursorPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['student', 'course', 'grade']
 
     def get_queryset(self):
         user = self.request.user
         if user.user_type == 'student':
-            return Result.objects.filter(student=user)
-        return Result.objects.all()
+            return Result.objects.filter(student=user).with_serializer_plan(user)
+        return Result.objects.with_serializer_plan(user)
+
+class BulkResultUploadView(APIView):
+    """
+    Upload a whole class result sheet for one course and session, either as
+    JSON ({"course_id", "session_id", "results": [{"student_id" or
+    "matric_number", "score"}]}) or as a CSV file with those columns.
+    """
+    permission_classes = (permissions.IsAuthenticated,)
+    parser_classes = (JSONParser, MultiPartParser, FormParser)
+
+    def post(self, request):
+        user = request.user
+        # Only registration officers, HODs and staff can post results
+        if not (user.user_type in ['registration_officer', 'hod'] or user.is_staff):
+            return Response(
+                {'detail': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            course = Course.objects.get(pk=request.data.get('course_id'))
+            session = AcademicSession.objects.get(pk=request.data.get('session_id'))
+        except (Course.DoesNotExist, AcademicSession.DoesNotExist, TypeError, ValueError):
+            return Response(
+                {'detail': 'Valid course_id and session_id are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        upload = request.FILES.get('file')
+        if upload is not None:
+            try:
+                reader = csv.DictReader(io.TextIOWrapper(upload.file, encoding='utf-8-sig'))
+                # Row numbers match the spreadsheet, counting the header as row 1
+                rows = [(reader.line_num, row) for row in reader]
+            except (UnicodeDecodeError, csv.Error):
+                return Response(
+                    {'detail': 'File must be a UTF-8 CSV'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            results = request.data.get('results')
+            if not isinstance(results, list):
+                return Response(
+                    {'detail': 'Provide a results list or a CSV file'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            rows = [(number, row if isinstance(row, dict) else {}) for number, row in enumerate(results, start=1)]
+
+        created, updated, errors = upload_results(course, session, rows)
+        return Response({
+            'detail': f'{created + updated} result(s) saved, {len(errors)} row(s) rejected',
+            'course_id': course.id,
+            'session_id': session.id,
+            'created': created,
+            'updated': updated,
+            'errors': errors
+        }, status=status.HTTP_200_OK if created + updated or not errors else status.HTTP_400_BAD_REQUEST)
+
+class CarryOverListView(APIView):
+    """Courses a student failed and has not passed since"""
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request):
+        user = request.user
+        student = user
+        if request.query_params.get('student'):
+            if not (user.user_type in ['registration_officer', 'hod', 'school_officer'] or user.is_staff):
+                return Response(
+                    {'detail': 'Permission denied'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            student = get_object_or_404(User, pk=request.query_params['student'], user_type='student')
+
+        carry_overs = [
+            {
+                'course_id': row['course_id'],
+                'code': row['course__code'],
+                'title': row['course__title'],
+                'units': row['course__units'],
+                'failed_session_id': row['session_id'],
+                'failed_session': row['session__name'],
+                'score': row['score']
+            }
+            for row in outstanding_carry_overs(student)
+        ]
+        return Response({
+            'student_id': student.id,
+            'total_units': sum(row['units'] for row in carry_overs),
+            'carry_overs': carry_overs
+        })
+
+class TranscriptView(APIView):
+    """A student's CGPA and per-session GPA, read from the materialized transcript"""
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request):
+        user = request.user
+        student = user
+        if request.query_params.get('student'):
+            if not (user.user_type in ['registration_officer', 'hod', 'school_officer'] or user.is_staff):
+                return Response(
+                    {'detail': 'Permission denied'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            student = get_object_or_404(User, pk=request.query_params['student'], user_type='student')
+
+        transcript = StudentTranscript.objects.filter(student=student).first()
+        if transcript is None:
+            # Results recorded before transcripts were materialized
+            StudentTranscript.refresh([student.id])
+            transcript = StudentTranscript.objects.get(student=student)
+
+        return Response({
+            'student_id': student.id,
+            'total_units': transcript.total_units,
+            'quality_points': transcript.quality_points,
+            'cgpa': str(transcript.cgpa),
+            'sessions': transcript.sessions,
+            'updated_at': transcript.updated_at
+        })
 
 class ResultDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ResultSerializer
@@ -247,23 +546,151 @@ class ResultDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.user_type == 'student':
-            return Result.objects.filter(student=user)
-        return Result.objects.all()
+            return Result.objects.filter(student=user).with_serializer_plan(user)
+        return Result.objects.with_serializer_plan(user)
 
-class PrintRegistrationFormView(APIView):
+class ExportView(generics.GenericAPIView):
+    """
+    Base for the officer CSV exports: a flat values_list() projection streamed
+    in chunks. Subclasses set queryset, filename, columns (header, lookup
+    pairs) and query_filters (query param -> lookup).
+    """
     permission_classes = (permissions.IsAuthenticated,)
+    filename = 'export.csv'
+    columns = ()
+    query_filters = {}
+    text_filters = ('status',)
 
-    def get(self, request, pk):
-        registration = get_object_or_404(Registration, pk=pk)
-        
-        # Check permissions
+    def get(self, request):
         user = request.user
-        if user.user_type == 'student' and registration.student != user:
+        if not (user.user_type in ['registration_officer', 'hod', 'school_officer'] or user.is_staff):
             return Response(
-                {"detail": "You do not have permission to view this registration form."},
+                {'detail': 'Permission denied'},
                 status=status.HTTP_403_FORBIDDEN
             )
 
+        lookups = {}
+        for param, lookup in self.query_filters.items():
+            value = request.query_params.get(param)
+            if value in (None, ''):
+                continue
+            if param not in self.text_filters and not value.isdigit():
+                return Response(
+                    {'detail': f'{param} must be an integer'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            lookups[lookup] = value
+
+        rows = (
+            self.get_queryset().filter(**lookups)
+            .values_list(*[lookup for _, lookup in self.columns])
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        return stream_csv(self.filename, [header for header, _ in self.columns], rows)
+
+class RegistrationExportView(ExportView):
+    queryset = Registration.objects.order_by('id')
+    filename = 'registrations.csv'
+    columns = (
+        ('registration_id', 'id'),
+        ('matric_number', 'student__matric_number'),
+        ('first_name', 'student__first_name'),
+        ('last_name', 'student__last_name'),
+        ('department', 'department__code'),
+        ('session', 'session__name'),
+        ('level', 'level'),
+        ('semester', 'semester'),
+        ('status', 'status'),
+        ('signature_stage', 'signature_stage'),
+        ('total_units', 'total_units'),
+        ('submitted_at', 'submitted_at'),
+    )
+    query_filters = {
+        'session': 'session_id',
+        'department': 'department_id',
+        'level': 'level',
+        'status': 'status',
+        'signature_stage': 'signature_stage',
+    }
+
+class RosterExportView(ExportView):
+    """Registered students per course, one row per registration course"""
+    queryset = RegistrationCourse.objects.order_by('course__code', 'registration__student__matric_number', 'id')
+    filename = 'course-rosters.csv'
+    columns = (
+        ('course', 'course__code'),
+        ('course_title', 'course__title'),
+        ('units', 'course__units'),
+        ('matric_number', 'registration__student__matric_number'),
+        ('first_name', 'registration__student__first_name'),
+        ('last_name', 'registration__student__last_name'),
+        ('department', 'registration__department__code'),
+        ('session', 'registration__session__name'),
+        ('level', 'registration__level'),
+        ('status', 'registration__status'),
+        ('carry_over', 'is_carry_over'),
+    )
+    query_filters = {
+        'course': 'course_id',
+        'session': 'registration__session_id',
+        'department': 'registration__department_id',
+        'level': 'registration__level',
+        'status': 'registration__status',
+        'signature_stage': 'registration__signature_stage',
+    }
+
+class ResultExportView(ExportView):
+    queryset = Result.objects.order_by('id')
+    filename = 'results.csv'
+    columns = (
+        ('matric_number', 'student__matric_number'),
+        ('first_name', 'student__first_name'),
+        ('last_name', 'student__last_name'),
+        ('department', 'student__department__code'),
+        ('level', 'student__level'),
+        ('course', 'course__code'),
+        ('units', 'course__units'),
+        ('session', 'session__name'),
+        ('score', 'score'),
+        ('grade', 'grade'),
+    )
+    query_filters = {
+        'course': 'course_id',
+        'session': 'session_id',
+        'department': 'student__department_id',
+        'level': 'student__level',
+    }
+
+def registration_form_version(view, request, pk):
+    """
+    The form changes with the registration, its student, its signers and the
+    catalog. Ownership is checked here, before any 304 can reveal that the
+    registration exists or has not changed.
+    """
+    stamp = Registration.objects.filter(pk=pk).values('student_id').annotate(
+        changed=models.Max('updated_at'),
+        student_changed=models.Max('student__updated_at'),
+        signers_changed=models.Max('signatures__signed_by__updated_at')
+    ).order_by('student_id').first()
+    if stamp is None:
+        raise Http404
+    user = request.user
+    if user.user_type == 'student' and stamp['student_id'] != user.pk:
+        raise PermissionDenied('You do not have permission to view this registration form.')
+    etag = make_etag(
+        pk, request.user.pk, CatalogVersion.current(),
+        stamp['changed'], stamp['student_changed'], stamp['signers_changed']
+    )
+    return etag, None
+
+class PrintRegistrationFormView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @conditional_get(registration_form_version)
+    def get(self, request, pk):
+        # Existence and permissions are checked by registration_form_version
+        registration = get_object_or_404(Registration, pk=pk)
+
         # Include signature information
         signatures = RegistrationSignature.objects.filter(registration=registration)
         signature_data = []
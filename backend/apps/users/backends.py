@@ -1,20 +1,47 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+from django.db.models.functions import Lower
+from rest_framework.request import Request
+from users import hashing
 
 User = get_user_model()
 
 class UsernameOrMatricBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
-        user = None
-        if username is not None:
-            try:
-                user = User.objects.get(username__iexact=username)
-            except User.DoesNotExist:
-                # Try matric number for students
-                try:
-                    user = User.objects.get(matric_number__iexact=username, user_type='student')
-                except User.DoesNotExist:
-                    return None
-            if user and user.check_password(password) and self.user_can_authenticate(user):
+        if username is None or password is None:
+            return None
+        user = self.get_login_user(username)
+        try:
+            if user is None:
+                # Run the hasher anyway so a missing account takes as long as a wrong password
+                hashing.set_password(User(), password)
+            elif hashing.check_password(user, password) and self.user_can_authenticate(user):
                 return user
-        return None 
\ No newline at end of file
+        except hashing.PasswordHashPoolBusy:
+            # DRF renders this as 503 with Retry-After; Django's own login forms
+            # (the admin) would turn it into a 500, so fail the attempt there instead
+            if isinstance(request, Request):
+                raise
+        # This backend already covers every username ModelBackend would look up,
+        # so stop here rather than let it hash the same password a second time
+        raise PermissionDenied
+
+    @staticmethod
+    def get_login_user(identifier):
+        """
+        The user a login identifier names, in one query on the Lower(username)
+        and Lower(matric_number) indexes: a username match wins over a
+        student's matric number. The department is selected for the response.
+        """
+        identifier = identifier.lower()
+        users = list(
+            User.objects.select_related('department')
+            .alias(username_lower=Lower('username'), matric_number_lower=Lower('matric_number'))
+            .filter(Q(username_lower=identifier) | Q(matric_number_lower=identifier, user_type='student'))
+        )
+        for user in users:
+            if user.username.lower() == identifier:
+                return user
+        return users[0] if users else None
@@ -0,0 +1,168 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+DEFAULT_TIMEOUT = 10
+
+class PasswordHashPoolBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'The server is busy signing other users in. Please try again shortly.'
+    default_code = 'password_hash_pool_busy'
+    # DRF turns this into a Retry-After header
+    wait = 2
+
+# Per-process pool state; rebuilt after a fork so each web worker owns its pool
+_lock = threading.Lock()
+_pool = None
+_pool_pid = None
+_pending = 0
+_metrics = {
+    'completed': 0,
+    'rejected': 0,
+    'timed_out': 0,
+    'queue_wait_seconds_total': 0.0,
+    'queue_wait_seconds_max': 0.0,
+    'hash_seconds_total': 0.0,
+    'hash_seconds_max': 0.0,
+}
+
+def _init_worker():
+    import django
+    django.setup()
+
+def _check(password, encoded):
+    started = time.monotonic()
+    rehashed = []
+    is_correct = hashers.check_password(password, encoded, setter=lambda raw: rehashed.append(hashers.make_password(raw)))
+    return (is_correct, rehashed[0] if rehashed else None), started, time.monotonic()
+
+def _make(password):
+    started = time.monotonic()
+    return hashers.make_password(password), started, time.monotonic()
+
+def pool_size():
+    return getattr(settings, 'PASSWORD_HASH_POOL_WORKERS', 0)
+
+def _get_pool():
+    global _pool, _pool_pid, _pending
+    if _pool_pid != os.getpid():
+        # Inherited from the parent before a fork; that pool's tasks are not ours
+        _pool = None
+        _pending = 0
+    if _pool is None:
+        # Forking a threaded web worker can deadlock the child, so hashing
+        # processes come from a clean forkserver instead
+        _pool = ProcessPoolExecutor(
+            max_workers=pool_size(),
+            mp_context=multiprocessing.get_context('forkserver'),
+            initializer=_init_worker
+        )
+        _pool_pid = os.getpid()
+    return _pool
+
+def _task_done(future):
+    global _pending
+    with _lock:
+        _pending -= 1
+
+def _run(func, *args):
+    """
+    Run func in the hash pool and return its result, recording queue wait and
+    hash time. Raises PasswordHashPoolBusy instead of queueing past
+    PASSWORD_HASH_POOL_MAX_PENDING or waiting past PASSWORD_HASH_POOL_TIMEOUT.
+    """
+    global _pending, _pool
+    max_pending = getattr(settings, 'PASSWORD_HASH_POOL_MAX_PENDING', pool_size() * 4)
+    with _lock:
+        pool = _get_pool()
+        if _pending >= max_pending:
+            _metrics['rejected'] += 1
+            raise PasswordHashPoolBusy()
+        _pending += 1
+
+    submitted = time.monotonic()
+    try:
+        future = pool.submit(func, *args)
+    except BrokenProcessPool:
+        with _lock:
+            _pending -= 1
+            if _pool is pool:
+                _pool = None
+        raise PasswordHashPoolBusy()
+    # A task keeps its place in the pending count until it really finishes:
+    # cancel() cannot stop one that is already hashing
+    future.add_done_callback(_task_done)
+
+    try:
+        result, started, finished = future.result(
+            timeout=getattr(settings, 'PASSWORD_HASH_POOL_TIMEOUT', DEFAULT_TIMEOUT)
+        )
+    except TimeoutError:
+        future.cancel()
+        with _lock:
+            _metrics['timed_out'] += 1
+        raise PasswordHashPoolBusy()
+    except BrokenProcessPool:
+        # A hashing process died; start a fresh pool for the next request
+        with _lock:
+            if _pool is pool:
+                _pool = None
+        raise PasswordHashPoolBusy()
+
+    queue_wait = max(started - submitted, 0.0)
+    hash_time = finished - started
+    with _lock:
+        _metrics['completed'] += 1
+        _metrics['queue_wait_seconds_total'] += queue_wait
+        _metrics['queue_wait_seconds_max'] = max(_metrics['queue_wait_seconds_max'], queue_wait)
+        _metrics['hash_seconds_total'] += hash_time
+        _metrics['hash_seconds_max'] = max(_metrics['hash_seconds_max'], hash_time)
+    return result
+
+def check_password(user, raw_password):
+    """
+    user.check_password(raw_password), verified in the hash pool when
+    PASSWORD_HASH_POOL_WORKERS is set. An outdated hash is upgraded and saved
+    the same way Django does it.
+    """
+    if not pool_size():
+        return user.check_password(raw_password)
+    is_correct, rehashed = _run(_check, raw_password, user.password)
+    if rehashed:
+        user.password = rehashed
+        user.save(update_fields=['password'])
+    return is_correct
+
+def set_password(user, raw_password):
+    """user.set_password(raw_password), hashed in the pool when it is enabled."""
+    if not pool_size():
+        user.set_password(raw_password)
+        return
+    user.password = _run(_make, raw_password)
+    # Lets password validators' password_changed() see the new password on save
+    user._password = raw_password
+
+def metrics():
+    """Counters for this web worker's pool, for sizing PASSWORD_HASH_POOL_WORKERS."""
+    with _lock:
+        snapshot = dict(_metrics)
+        in_flight = _pending
+    completed = snapshot['completed']
+    return {
+        'enabled': bool(pool_size()),
+        'pid': os.getpid(),
+        'workers': pool_size(),
+        'max_pending': getattr(settings, 'PASSWORD_HASH_POOL_MAX_PENDING', pool_size() * 4),
+        'in_flight': in_flight,
+        **snapshot,
+        'queue_wait_seconds_avg': snapshot['queue_wait_seconds_total'] / completed if completed else 0.0,
+        'hash_seconds_avg': snapshot['hash_seconds_total'] / completed if completed else 0.0,
+    }
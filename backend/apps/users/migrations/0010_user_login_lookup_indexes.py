@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:30
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('courses', '0019_academicsession_updated_at'),
+        ('users', '0009_user_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('username'), name='user_username_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('matric_number'), name='user_matric_number_lower_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 
 class User(AbstractUser):
     USER_TYPE_CHOICES = (
@@ -18,12 +19,18 @@ class User(AbstractUser):
     registered_courses = models.ManyToManyField('courses.Course', related_name='registered_students', blank=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
     signature = models.ImageField(upload_to='signatures/', blank=True, null=True, help_text="Digital signature for admin users")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'users'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['username']
+        indexes = [
+            # Case-insensitive login lookups (see UsernameOrMatricBackend.get_login_user)
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+            models.Index(Lower('matric_number'), name='user_matric_number_lower_idx'),
+        ]
 
     def __str__(self):
         return f"{self.username} - {self.get_user_type_display()}"
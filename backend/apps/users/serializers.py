@@ -5,34 +5,28 @@ from django.contrib.auth import get_user_model
 from courses.models import Department
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import authenticate
+from django.contrib.auth.models import update_last_login
+from rest_framework_simplejwt.settings import api_settings
 
 User = get_user_model()
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def validate(self, attrs):
-        username = attrs.get('username')
-        password = attrs.get('password')
-        
-        # Try to find user by username first
-        user = User.objects.filter(username__iexact=username).first()
-        
-        # If not found, try matric number for students
-        if not user:
-            user = User.objects.filter(matric_number__iexact=username, user_type='student').first()
-        
-        if not user:
-            raise serializers.ValidationError({'detail': 'No active account found with the given credentials'})
-        
-        # Authenticate using the actual username
-        auth_user = authenticate(username=user.username, password=password)
-        if not auth_user:
+        # The backend resolves a username or matric number in one query and checks
+        # the password once; the parent validate() would authenticate all over again
+        self.user = authenticate(
+            self.context.get('request'),
+            username=attrs.get('username'),
+            password=attrs.get('password')
+        )
+        if not api_settings.USER_AUTHENTICATION_RULE(self.user):
             raise serializers.ValidationError({'detail': 'No active account found with the given credentials'})
-        
-        # Update attrs with the actual username for the parent serializer
-        attrs['username'] = user.username
-        
-        # Call parent validate method
-        data = super().validate(attrs)
+
+        user = self.user
+        refresh = self.get_token(user)
+        data = {'refresh': str(refresh), 'access': str(refresh.access_token)}
+        if api_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
         
         # Add user data to response
         data['user'] = {
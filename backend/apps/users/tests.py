@@ -1,3 +1,55 @@
-from django.test import TestCase
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from users import hashing
+from .models import User
 
 # Create your tests here.
+
+@mock.patch.object(hashing, 'check_password', side_effect=hashing.PasswordHashPoolBusy)
+class PasswordHashPoolBusyTests(TestCase):
+    """A full hash pool must not turn a login into a server error."""
+
+    def setUp(self):
+        User.objects.create_user(
+            username='admin', email='admin@example.com', password='password',
+            user_type='registration_officer', is_staff=True
+        )
+
+    def test_api_login_gets_503(self, check_password):
+        response = APIClient().post('/api/users/token/', {'username': 'admin', 'password': 'password'}, format='json')
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+
+    def test_admin_login_fails_like_a_wrong_password(self, check_password):
+        response = self.client.post('/admin/login/', {'username': 'admin', 'password': 'password'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+@override_settings(PASSWORD_HASH_POOL_WORKERS=1)
+class PasswordHashMetricsTests(TestCase):
+    """Logins are hashed in the same pool the metrics view reports on."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='admin', email='admin@example.com', password='password',
+            user_type='registration_officer', is_staff=True
+        )
+        self.addCleanup(lambda: hashing._pool and hashing._pool.shutdown())
+
+    def metrics(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        response = client.get('/api/users/password-hash-metrics/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_login_is_counted(self):
+        before = self.metrics()
+        self.assertTrue(before['enabled'])
+        response = APIClient().post('/api/users/token/', {'username': 'admin', 'password': 'password'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        after = self.metrics()
+        self.assertEqual(after['completed'], before['completed'] + 1)
+        self.assertGreater(after['hash_seconds_total'], before['hash_seconds_total'])
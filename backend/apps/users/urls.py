@@ -11,4 +11,5 @@ urlpatterns = [
     path('register/', views.UserRegistrationView.as_view(), name='register'),
     path('change-password/', views.ChangePasswordView.as_view(), name='change-password'),
     path('reset-password/', views.ResetPasswordView.as_view(), name='reset-password'),
+    path('password-hash-metrics/', views.PasswordHashMetricsView.as_view(), name='password-hash-metrics'),
 ] 
\ No newline at end of file
@@ -9,9 +9,13 @@ from .serializers import (
     ResetPasswordSerializer,
     CustomTokenObtainPairSerializer
 )
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
+from courses.conditional import conditional_get, make_etag
+from courses.models import Department
+from users import hashing
 
 User = get_user_model()
 
@@ -23,17 +27,28 @@ class UserRegistrationView(generics.CreateAPIView):
 class LoginView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
     def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
-        if response.status_code == status.HTTP_200_OK:
-            # Use the username that was actually authenticated
-            user_obj = User.objects.get(username=response.data['user']['username'] if 'user' in response.data else request.data['username'])
-            user_data = UserSerializer(user_obj).data
-            response.data['user'] = user_data
-        return response
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        # Reuse the user the serializer authenticated instead of fetching it again
+        data = serializer.validated_data
+        data['user'] = UserSerializer(serializer.user).data
+        return Response(data, status=status.HTTP_200_OK)
+
+def profile_version(view, request):
+    """The profile shows the user row plus their department's name and code."""
+    user = request.user
+    department_changed = Department.objects.filter(pk=user.department_id).values_list('updated_at', flat=True).first()
+    last_modified = max(filter(None, (user.updated_at, department_changed)), default=None)
+    return make_etag(user.pk, user.updated_at, department_changed), last_modified
 
 class UserProfileView(APIView):
     permission_classes = [IsAuthenticated]
     
+    @conditional_get(profile_version)
     def get(self, request):
         serializer = UserSerializer(request.user)
         return Response(serializer.data)
@@ -72,13 +87,13 @@ class ChangePasswordView(generics.UpdateAPIView):
         serializer.is_valid(raise_exception=True)
 
         user = self.get_object()
-        if not user.check_password(serializer.data.get("old_password")):
+        if not hashing.check_password(user, serializer.data.get("old_password")):
             return Response(
                 {"old_password": ["Wrong password."]},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        user.set_password(serializer.data.get("new_password"))
+        hashing.set_password(user, serializer.data.get("new_password"))
         user.save()
         return Response(
             {"message": "Password updated successfully"},
@@ -103,3 +118,15 @@ class ResetPasswordView(generics.GenericAPIView):
             {"message": "Password reset instructions sent to your email."},
             status=status.HTTP_200_OK
         )
+
+class PasswordHashMetricsView(APIView):
+    """Queue and timing counters of this worker's password hash pool (staff only)"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if not request.user.is_staff:
+            return Response(
+                {'detail': 'Permission denied'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(hashing.metrics())
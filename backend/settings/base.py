@@ -115,6 +115,7 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'idempotency-key',
 ]
 
 # Rest Framework settings
@@ -142,7 +143,10 @@ SIMPLE_JWT = {
 }
 
 # Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Mail is queued in the outbox and delivered by `python manage.py dispatch_emails`.
+# Set EMAIL_BACKEND=django.core.mail.backends.filebased.EmailBackend to write mail to EMAIL_FILE_PATH instead.
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', os.path.join(BASE_DIR, 'sent_emails'))
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
@@ -151,7 +155,26 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = 'Course Registration <' + os.getenv('EMAIL_HOST_USER', '') + '>'
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
 
+# How long a stored Idempotency-Key response is replayed for
+IDEMPOTENCY_KEY_TTL = timedelta(hours=int(os.getenv('IDEMPOTENCY_KEY_TTL_HOURS', 24)))
+
+# How long a course added to the selection cart keeps its seat
+SEAT_HOLD_TTL = timedelta(minutes=int(os.getenv('SEAT_HOLD_TTL_MINUTES', 15)))
+
+# How long a seat handed over from the waitlist is held for the student to register
+WAITLIST_CLAIM_TTL = timedelta(hours=int(os.getenv('WAITLIST_CLAIM_TTL_HOURS', 24)))
+
+# How long each worker reuses its cached current academic session
+CURRENT_SESSION_TTL = timedelta(seconds=int(os.getenv('CURRENT_SESSION_TTL_SECONDS', 60)))
+
+# Password hashing and verification run in a process pool of this many workers
+# per web worker (0 keeps them inline); past MAX_PENDING queued requests, or
+# after TIMEOUT seconds, logins get a 503 instead of piling up
+PASSWORD_HASH_POOL_WORKERS = int(os.getenv('PASSWORD_HASH_POOL_WORKERS', 0))
+PASSWORD_HASH_POOL_MAX_PENDING = int(os.getenv('PASSWORD_HASH_POOL_MAX_PENDING', PASSWORD_HASH_POOL_WORKERS * 4))
+PASSWORD_HASH_POOL_TIMEOUT = int(os.getenv('PASSWORD_HASH_POOL_TIMEOUT_SECONDS', 10))
+
 AUTHENTICATION_BACKENDS = [
-    'apps.users.backends.UsernameOrMatricBackend',
+    'users.backends.UsernameOrMatricBackend',
     'django.contrib.auth.backends.ModelBackend',
 ] 
\ No newline at end of file
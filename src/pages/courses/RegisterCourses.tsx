@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../../context/AuthContext';
-import { getCourses, registerForCourses, Course } from '../../services/courses.service';
+import { getCourses, registerForCourses, holdCourseSeat, releaseCourseSeat, Course } from '../../services/courses.service';
 import './RegisterCourses.css';
 
 const RegisterCourses = () => {
@@ -61,6 +61,25 @@ const RegisterCourses = () => {
     }
   }, [selectedCourses, courses]);
 
+  // Seats are held on the server while courses sit in the selection; a course
+  // that turns out to be full is dropped from the selection again. Any other
+  // failure leaves the course selected and is checked again on submission.
+  const holdSeat = (courseId: number, units: number) => {
+    holdCourseSeat(courseId).catch((err: any) => {
+      if (err.response?.data?.detail !== 'Course is full') {
+        return;
+      }
+      setSelectedCourses(prev => prev.filter(id => id !== courseId));
+      setTotalUnits(prev => prev - units);
+      const course = courses.find(c => c.id === courseId);
+      setError(`${course ? course.code + ': ' : ''}${err.response?.data?.detail || 'Could not hold a seat'}`);
+    });
+  };
+
+  const releaseSeat = (courseId: number) => {
+    releaseCourseSeat(courseId).catch(() => {});
+  };
+
   const handleCourseSelect = (courseId: number, units: number) => {
     setSelectedCourses(prev => {
       const isSelected = prev.includes(courseId);
@@ -83,11 +102,18 @@ const RegisterCourses = () => {
       setError('');
       return newSelected;
     });
+
+    if (selectedCourses.includes(courseId)) {
+      releaseSeat(courseId);
+    } else if (totalUnits + units <= 24) {
+      holdSeat(courseId, units);
+    }
   };
 
   const handleSelectAll = () => {
     if (selectAllChecked) {
       // Deselect all courses
+      selectedCourses.forEach(releaseSeat);
       setSelectedCourses([]);
       setTotalUnits(0);
       setSelectAllChecked(false);
@@ -112,6 +138,11 @@ const RegisterCourses = () => {
         }
       }
       
+      selectedCourses.filter(id => !newSelected.includes(id)).forEach(releaseSeat);
+      sortedCourses
+        .filter(course => newSelected.includes(course.id) && !selectedCourses.includes(course.id))
+        .forEach(course => holdSeat(course.id, course.units));
+
       setSelectedCourses(newSelected);
       setTotalUnits(newTotalUnits);
       setSelectAllChecked(newSelected.length === courses.length);
@@ -148,6 +148,18 @@ export const registerForCourses = async (courseIds: number[], comments?: string)
   return response.data;
 };
 
+// Student: Hold a seat while a course is in the selection cart
+export const holdCourseSeat = async (courseId: number) => {
+  const response = await axios.post(`/courses/courses/${courseId}/hold/`);
+  return response.data;
+};
+
+// Student: Give back a held seat when a course leaves the selection cart
+export const releaseCourseSeat = async (courseId: number) => {
+  const response = await axios.delete(`/courses/courses/${courseId}/hold/`);
+  return response.data;
+};
+
 // Student: Get registration status
 export const getRegistrationStatus = async (): Promise<RegistrationStatus[]> => {
   const response = await axios.get('/courses/registrations/status/');